@@ -10,20 +10,33 @@ It performs the following tasks:
 - Generates a comprehensive analysis report
 """
 
+import argparse
+import glob
 import pandas as pd
 import sys
 from datetime import datetime
-from collections import defaultdict
 
+from money import to_cents
+from reconciliation import reconcile_exact, reconcile_fuzzy
+from source_readers import detect_encoding, read_cashapp, read_paypal_business, read_paypal_personal
 
-def load_csv_safely(filepath, encoding='utf-8'):
-    """Load CSV file with fallback encoding handling."""
+
+# Audit Source label -> (export file patterns, schema reader, amount column in cents)
+SOURCE_FILES = {
+    'Personal': (['personal-6.CSV'], read_paypal_personal, 'Total_Cents'),
+    'Business/Main': (['Download-6.CSV'], read_paypal_business, 'Net_Cents'),
+    'Cash App': (['cash_app_report_*.csv'], read_cashapp, 'Net Amount_Cents'),
+}
+
+
+def load_csv_safely(filepath, reader=None):
+    """Load a CSV with its schema reader (or the encoding from its BOM), None on failure."""
     try:
-        return pd.read_csv(filepath, encoding=encoding)
-    except UnicodeDecodeError:
+        if reader is not None:
+            return reader(filepath)
         try:
-            return pd.read_csv(filepath, encoding='utf-8-sig')
-        except:
+            return pd.read_csv(filepath, encoding=detect_encoding(filepath))
+        except UnicodeDecodeError:
             return pd.read_csv(filepath, encoding='latin-1')
     except Exception as e:
         print(f"Error loading {filepath}: {e}")
@@ -50,29 +63,45 @@ def analyze_data_structure(df, name):
     return df
 
 
-def compare_transactions(audit_df, personal_df):
-    """Compare audit file with personal transactions."""
+def prepare_source(df, amount_col):
+    """Add Date_Clean / Amount_Cents match keys to a source export read by its schema reader."""
+    df = df.copy()
+    # Cash App dates carry a time of day; match on the day
+    if pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date_Clean'] = df['Date'].dt.normalize()
+    else:
+        df['Date_Clean'] = pd.to_datetime(df['Date'].astype(str).str[:10], errors='coerce')
+    df['Amount_Cents'] = df[amount_col]
+    return df
+
+
+def compare_transactions(audit_df, source_dfs, tolerances=None):
+    """
+    Compare audit file with each source export (dict of Source label -> prepared frame).
+
+    With ``tolerances`` (dict of date_tolerance / amount_tolerance in cents) matching is
+    fuzzy and each matched pair carries a confidence score.
+    """
     print(f"\n{'='*60}")
     print("TRANSACTION COMPARISON ANALYSIS")
     print(f"{'='*60}")
 
     # Clean and prepare data
     audit_df['Date_Clean'] = pd.to_datetime(audit_df['Date'], errors='coerce')
-    personal_df['Date_Clean'] = pd.to_datetime(personal_df['Date'], errors='coerce')
 
-    # Convert amounts to float for comparison
-    audit_df['Amount_Float'] = pd.to_numeric(audit_df['Amount'], errors='coerce')
-    personal_df['Total_Float'] = pd.to_numeric(personal_df['Total'], errors='coerce')
+    # Match on integer cents (exact, unlike float equality)
+    audit_df['Amount_Cents'] = to_cents(audit_df['Amount'])
 
     print(f"\nAudit File Stats:")
     print(f"  Total Transactions: {len(audit_df)}")
     print(f"  Date Range: {audit_df['Date_Clean'].min()} to {audit_df['Date_Clean'].max()}")
-    print(f"  Total Amount: ${audit_df['Amount_Float'].sum():,.2f}")
+    print(f"  Total Amount: ${audit_df['Amount_Cents'].sum() / 100:,.2f}")
 
-    print(f"\nPersonal File Stats:")
-    print(f"  Total Transactions: {len(personal_df)}")
-    print(f"  Date Range: {personal_df['Date_Clean'].min()} to {personal_df['Date_Clean'].max()}")
-    print(f"  Total Amount: ${personal_df['Total_Float'].sum():,.2f}")
+    for source_name, source_df in source_dfs.items():
+        print(f"\n{source_name} Source Stats:")
+        print(f"  Total Transactions: {len(source_df)}")
+        print(f"  Date Range: {source_df['Date_Clean'].min()} to {source_df['Date_Clean'].max()}")
+        print(f"  Total Amount: ${source_df['Amount_Cents'].sum() / 100:,.2f}")
 
     # Analysis Status breakdown
     print(f"\n{'='*60}")
@@ -108,62 +137,58 @@ def compare_transactions(audit_df, personal_df):
     print("TRANSACTION MATCHING ANALYSIS")
     print(f"{'='*60}")
 
-    # Try to match transactions by date and amount
-    matched = 0
-    unmatched_audit = []
-
-    for idx, audit_row in audit_df.iterrows():
-        audit_date = audit_row['Date_Clean']
-        audit_amount = audit_row['Amount_Float']
-
-        # Look for matching transaction in personal file
-        matches = personal_df[
-            (personal_df['Date_Clean'] == audit_date) &
-            (personal_df['Total_Float'] == audit_amount)
-        ]
-
-        if len(matches) > 0:
-            matched += 1
+    # Match each source's audit rows to that source by (date, amount), one-to-one
+    if tolerances:
+        print(f"Fuzzy matching: ±{tolerances['date_tolerance']} and ±${tolerances['amount_tolerance'] / 100:.2f}")
+    results = {}
+    for source_name, source_df in source_dfs.items():
+        if 'Source' in audit_df.columns:
+            audit_rows = audit_df[audit_df['Source'] == source_name]
         else:
-            unmatched_audit.append(audit_row)
-
-    print(f"Matched Transactions: {matched} ({matched/len(audit_df)*100:.2f}%)")
-    print(f"Unmatched in Audit: {len(unmatched_audit)} ({len(unmatched_audit)/len(audit_df)*100:.2f}%)")
-
-    # Check for transactions in personal not in audit
-    unmatched_personal = 0
-    for idx, personal_row in personal_df.iterrows():
-        pers_date = personal_row['Date_Clean']
-        pers_amount = personal_row['Total_Float']
-
-        matches = audit_df[
-            (audit_df['Date_Clean'] == pers_date) &
-            (audit_df['Amount_Float'] == pers_amount)
-        ]
-
-        if len(matches) == 0:
-            unmatched_personal += 1
-
-    print(f"Transactions in Personal not in Audit: {unmatched_personal}")
+            audit_rows = audit_df
+
+        if tolerances:
+            matched, unmatched_audit, unmatched_source = reconcile_fuzzy(
+                audit_rows, source_df,
+                ['Date_Clean', 'Amount_Cents'], ['Date_Clean', 'Amount_Cents'],
+                **tolerances
+            )
+        else:
+            matched, unmatched_audit, unmatched_source = reconcile_exact(
+                audit_rows, source_df,
+                ['Date_Clean', 'Amount_Cents'], ['Date_Clean', 'Amount_Cents']
+            )
+        results[source_name] = {
+            'matched': matched,
+            'unmatched_audit': unmatched_audit,
+            'unmatched_source': unmatched_source,
+        }
+
+        audit_count = max(len(audit_rows), 1)
+        print(f"\n{source_name}:")
+        print(f"  Matched Transactions: {len(matched)} ({len(matched)/audit_count*100:.2f}% of audit rows)")
+        print(f"  Unmatched in Audit: {len(unmatched_audit)} ({len(unmatched_audit)/audit_count*100:.2f}%)")
+        print(f"  Transactions in {source_name} not in Audit: {len(unmatched_source)}")
+        if tolerances and len(matched) > 0:
+            inexact = matched[matched['confidence'] < 1.0]
+            print(f"  Tolerance matches: {len(inexact)} (mean confidence {matched['confidence'].mean():.3f})")
 
     # Additional data sources analysis
     print(f"\n{'='*60}")
     print("ADDITIONAL DATA SOURCES ANALYSIS")
     print(f"{'='*60}")
 
-    if len(unmatched_audit) > 0:
-        print(f"\nFound {len(unmatched_audit)} transactions in audit that don't match personal file.")
-        print(f"This suggests there may be additional data sources.")
-
-        # Check if these are from business source
-        if 'Source' in audit_df.columns:
-            unmatched_df = pd.DataFrame(unmatched_audit)
-            if 'Source' in unmatched_df.columns:
-                unmatched_sources = unmatched_df['Source'].value_counts()
-                print(f"\nSources of unmatched transactions:")
-                print(unmatched_sources)
+    if 'Source' in audit_df.columns:
+        orphaned = audit_df[~audit_df['Source'].isin(list(source_dfs))]
+        if len(orphaned) > 0:
+            print(f"\nFound {len(orphaned)} audit transactions from sources with no export loaded.")
+            print(f"This suggests there may be additional data sources.")
+            print(f"\nSources of unmatched transactions:")
+            print(orphaned['Source'].value_counts())
+        else:
+            print("\nEvery audit source has a matching export loaded.")
 
-    return matched, len(unmatched_audit), unmatched_personal
+    return results
 
 
 def analyze_data_consistency(audit_df):
@@ -191,8 +216,28 @@ def analyze_data_consistency(audit_df):
     return True
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Verify the PayPal audit against its source exports.")
+    parser.add_argument('--fuzzy', action='store_true',
+                        help="Match within date/amount tolerances instead of exactly")
+    parser.add_argument('--date-tolerance-days', type=float, default=1.0,
+                        help="Fuzzy mode: max days between audit and source dates (default: 1)")
+    parser.add_argument('--amount-tolerance', type=float, default=0.05,
+                        help="Fuzzy mode: max dollar difference between amounts (default: 0.05)")
+    return parser.parse_args()
+
+
 def main():
     """Main analysis function."""
+    args = parse_args()
+    tolerances = None
+    if args.fuzzy:
+        tolerances = {
+            'date_tolerance': pd.Timedelta(days=args.date_tolerance_days),
+            'amount_tolerance': round(args.amount_tolerance * 100),
+        }
+
     print("="*60)
     print("PAYPAL AUDIT ANALYSIS")
     print("="*60)
@@ -202,18 +247,35 @@ def main():
     print("\nLoading data files...")
 
     audit_df = load_csv_safely('PayPal_True_Spend_Audit.csv')
-    personal_df = load_csv_safely('personal-6.CSV')
+    if audit_df is None:
+        print("Error: Could not load required files")
+        sys.exit(1)
 
-    if audit_df is None or personal_df is None:
+    source_dfs = {}
+    for source_name, (patterns, reader, amount_col) in SOURCE_FILES.items():
+        paths = sorted(path for pattern in patterns for path in glob.glob(pattern))
+        frames = [df for df in (load_csv_safely(path, reader) for path in paths) if df is not None]
+        if not frames:
+            print(f"  Skipping {source_name}: no export files found")
+            continue
+        source_df = pd.concat(frames, ignore_index=True)
+        source_dfs[source_name] = prepare_source(source_df, amount_col)
+
+    if 'Personal' not in source_dfs:
         print("Error: Could not load required files")
         sys.exit(1)
 
     # Analyze structures
     audit_df = analyze_data_structure(audit_df, "PayPal True Spend Audit")
-    personal_df = analyze_data_structure(personal_df, "Personal PayPal Transactions")
+    for source_name, source_df in source_dfs.items():
+        analyze_data_structure(source_df, f"{source_name} Transactions")
 
     # Compare transactions
-    matched, unmatched_audit, unmatched_personal = compare_transactions(audit_df, personal_df)
+    results = compare_transactions(audit_df, source_dfs, tolerances)
+    matched = sum(len(r['matched']) for r in results.values())
+    unmatched_audit = sum(len(r['unmatched_audit']) for r in results.values())
+    unmatched_source = sum(len(r['unmatched_source']) for r in results.values())
+    source_rows = sum(len(df) for df in source_dfs.values())
 
     # Analyze data quality
     analyze_data_consistency(audit_df)
@@ -223,24 +285,26 @@ def main():
     print("FINAL SUMMARY")
     print(f"{'='*60}")
     print(f"\n✓ Audit file contains {len(audit_df)} total transactions")
-    print(f"✓ Personal file contains {len(personal_df)} total transactions")
+    for source_name, source_df in source_dfs.items():
+        result = results[source_name]
+        print(f"✓ {source_name}: {len(source_df)} source transactions, {len(result['matched'])} matched, "
+              f"{len(result['unmatched_audit'])} audit-only, {len(result['unmatched_source'])} source-only")
     print(f"✓ {matched} transactions matched between files")
-    print(f"✓ {unmatched_audit} transactions in audit not found in personal file")
-    print(f"✓ {unmatched_personal} transactions in personal not found in audit file")
+    print(f"✓ {unmatched_audit} transactions in audit not found in a source file")
+    print(f"✓ {unmatched_source} transactions in source files not found in audit file")
 
     print(f"\n{'='*60}")
     print("CONCLUSIONS")
     print(f"{'='*60}")
 
     if unmatched_audit > 0:
-        print(f"\n⚠ The audit file contains transactions not present in the personal file.")
+        print(f"\n⚠ The audit file contains transactions not present in the source files.")
         print(f"  This indicates additional data sources are being used.")
-        print(f"  Note: business_paypal-6.CSV file is empty (0 bytes)")
-        print(f"  Recommendation: Verify if there's a business PayPal account file that should be included.")
+        print(f"  Recommendation: Verify every account export is included in SOURCE_FILES.")
 
-    if len(audit_df) > len(personal_df):
-        print(f"\n⚠ Audit file has MORE transactions than the personal file.")
-        print(f"  Difference: {len(audit_df) - len(personal_df)} transactions")
+    if len(audit_df) > source_rows:
+        print(f"\n⚠ Audit file has MORE transactions than the source files.")
+        print(f"  Difference: {len(audit_df) - source_rows} transactions")
 
     print(f"\n✓ Analysis complete!")
 
@@ -251,10 +315,15 @@ def main():
         f.write("="*60 + "\n")
         f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
         f.write(f"Audit Transactions: {len(audit_df)}\n")
-        f.write(f"Personal Transactions: {len(personal_df)}\n")
+        for source_name, source_df in source_dfs.items():
+            result = results[source_name]
+            f.write(f"{source_name} Transactions: {len(source_df)}\n")
+            f.write(f"  Matched: {len(result['matched'])}\n")
+            f.write(f"  Unmatched in Audit: {len(result['unmatched_audit'])}\n")
+            f.write(f"  Unmatched in {source_name}: {len(result['unmatched_source'])}\n")
         f.write(f"Matched: {matched}\n")
         f.write(f"Unmatched in Audit: {unmatched_audit}\n")
-        f.write(f"Unmatched in Personal: {unmatched_personal}\n")
+        f.write(f"Unmatched in Sources: {unmatched_source}\n")
         f.write("\nConclusion: See console output for detailed analysis.\n")
 
     print(f"\n📄 Report saved to: ANALYSIS_REPORT.txt")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Audit Storage
+
+Reads and writes audit and dashboard datasets. The format follows the file
+extension: .csv, .parquet or .feather (Arrow IPC). Columnar files keep dtypes,
+so dates and amounts are not re-parsed on every load. Low-cardinality text
+columns are stored dictionary-encoded, and readers can load only the columns
+they need.
+
+In memory, compact_frame gives the same dictionary-encoded labels plus money
+as int64 cents, so long multi-account histories fit in a small container;
+expand_frame restores the dollar columns for output.
+
+Long histories can also be stored partitioned by month: one directory per
+month (``month=YYYY-MM``) holding that month's rows, so a query for a date
+window reads only the partitions it overlaps.
+
+Columnar formats need pyarrow (pip install pyarrow).
+"""
+
+import os
+
+import pandas as pd
+
+from money import CENTS_SUFFIX, from_cents, to_cents
+
+try:
+    import pyarrow  # noqa: F401  (pandas uses it for Parquet / Feather)
+except ImportError:
+    pyarrow = None
+
+
+# Repeated status / label strings stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = [
+    'Analysis_Status', 'Exclusion_Reason', 'Category', 'Source', 'Type', 'Status',
+    'Group', 'MonthName',
+]
+
+# Directory prefix of a month partition (hive style: month=2025-07)
+PARTITION_PREFIX = 'month='
+# Partition holding rows whose date could not be parsed
+UNDATED_PARTITION = 'undated'
+
+# Money columns held in memory as integer cents (renamed with money.CENTS_SUFFIX)
+AMOUNT_COLUMNS = ['Amount', 'Net_Amount']
+
+FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+}
+
+
+def storage_format(path):
+    """Storage format implied by a file extension ('csv', 'parquet' or 'feather')."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported dataset extension '{ext}' for {path} (use .csv, .parquet or .feather)")
+    return FORMATS[ext]
+
+
+def with_extension(path, fmt):
+    """Swap the extension of ``path`` for the given storage format."""
+    ext = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}[fmt]
+    return os.path.splitext(path)[0] + ext
+
+
+def _require_pyarrow(path):
+    if pyarrow is None:
+        raise ImportError(f"Writing/reading {path} needs pyarrow: pip install pyarrow")
+
+
+def to_storage_dtypes(df):
+    """Low-cardinality text columns as categoricals (dictionary-encoded on disk)."""
+    df = df.copy(deep=False)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def to_cents_columns(df):
+    """
+    AMOUNT_COLUMNS as integer cents (``Amount`` -> ``Amount_Cents``, in the
+    same column position). Unchanged columns are shared with ``df``, not
+    copied.
+    """
+    amounts = [col for col in AMOUNT_COLUMNS if col in df.columns]
+    if not amounts:
+        return df
+    df = df.copy(deep=False)
+    for col in amounts:
+        df[col] = to_cents(df[col])
+    return df.rename(columns={col: col + CENTS_SUFFIX for col in amounts})
+
+
+def compact_frame(df):
+    """Compact in-memory dtypes: CATEGORICAL_COLUMNS as categoricals and AMOUNT_COLUMNS as cents."""
+    return to_cents_columns(to_storage_dtypes(df))
+
+
+def expand_frame(df):
+    """Cents columns back to dollar columns under their original names (for output)."""
+    cents = [col for col in df.columns if col.endswith(CENTS_SUFFIX)]
+    if not cents:
+        return df
+    df = df.copy(deep=False)
+    for col in cents:
+        df[col] = from_cents(df[col])
+    return df.rename(columns={col: col[:-len(CENTS_SUFFIX)] for col in cents})
+
+
+def assign_label(df, mask, column, value):
+    """``df.loc[mask, column] = value`` that also works on categorical columns."""
+    dtype = df[column].dtype
+    if isinstance(dtype, pd.CategoricalDtype) and value not in dtype.categories:
+        df[column] = df[column].cat.add_categories([value])
+    df.loc[mask, column] = value
+
+
+def label_counts(series):
+    """``series.value_counts()`` without the zero counts of unused categories."""
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
+def write_dataset(df, path):
+    """Write a dataset in the format given by the extension of ``path``."""
+    fmt = storage_format(path)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return
+
+    _require_pyarrow(path)
+    df = to_storage_dtypes(df).reset_index(drop=True)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False, compression='zstd')
+    else:
+        df.to_feather(path, compression='zstd')
+
+
+def read_dataset(path, columns=None):
+    """
+    Read a dataset written by write_dataset (or any CSV).
+
+    ``columns`` limits the load to those columns; columnar formats then skip
+    the other columns on disk entirely.
+    """
+    fmt = storage_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, usecols=columns)
+
+    _require_pyarrow(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+def dataset_columns(path):
+    """Column names of a dataset without loading its rows."""
+    fmt = storage_format(path)
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    _require_pyarrow(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet
+        return list(pyarrow.parquet.read_schema(path).names)
+    import pyarrow.ipc
+    with pyarrow.ipc.open_file(path) as reader:
+        return list(reader.schema.names)
+
+
+def append_dataset(df, path):
+    """
+    Append rows to an existing dataset in its existing column order.
+
+    CSV files are appended in place; columnar files are rewritten with the
+    new rows added.
+    """
+    fmt = storage_format(path)
+    if fmt == 'csv':
+        columns = pd.read_csv(path, nrows=0).columns
+        df[columns].to_csv(path, mode='a', header=False, index=False)
+        return
+
+    existing = read_dataset(path)
+    combined = pd.concat([existing, df[existing.columns]], ignore_index=True)
+    write_dataset(combined, path)
+
+
+def is_partitioned(path):
+    """Whether ``path`` is a month-partitioned dataset directory."""
+    return os.path.isdir(path)
+
+
+def partition_months(path):
+    """Months ('YYYY-MM') stored in a partitioned dataset, oldest first."""
+    return sorted(name[len(PARTITION_PREFIX):] for name in os.listdir(path)
+                  if name.startswith(PARTITION_PREFIX) and name != PARTITION_PREFIX + UNDATED_PARTITION)
+
+
+def _partition_files(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if os.path.splitext(name)[1].lower() in FORMATS)
+
+
+def write_partitioned(df, path, dates, fmt='parquet'):
+    """
+    Write ``df`` as one partition per month of ``dates`` (datetimes aligned
+    with ``df``) under the directory ``path``.
+
+    Only the months present in ``df`` are replaced; other partitions are left
+    as they are, so adding a month of history rewrites just that month.
+    """
+    months = pd.Series(pd.to_datetime(dates).dt.strftime('%Y-%m'), index=df.index).fillna(UNDATED_PARTITION)
+    for month, part in df.groupby(months, sort=True):
+        directory = os.path.join(path, PARTITION_PREFIX + month)
+        os.makedirs(directory, exist_ok=True)
+        for stale in _partition_files(directory):
+            os.remove(stale)
+        write_dataset(part, with_extension(os.path.join(directory, 'part-0'), fmt))
+
+
+def read_partitioned(path, start=None, end=None, columns=None):
+    """
+    Read a month-partitioned dataset, loading only months from ``start`` to
+    ``end`` ('YYYY-MM' or anything pd.Period accepts; None leaves that side
+    open). Undated rows are read only when neither bound is given.
+    """
+    months = partition_months(path)
+    if start is not None:
+        months = [m for m in months if pd.Period(m, 'M') >= pd.Period(start, 'M')]
+    if end is not None:
+        months = [m for m in months if pd.Period(m, 'M') <= pd.Period(end, 'M')]
+    if start is None and end is None:
+        months.append(UNDATED_PARTITION)
+
+    directories = [os.path.join(path, PARTITION_PREFIX + month) for month in months]
+    files = [f for directory in directories if os.path.isdir(directory) for f in _partition_files(directory)]
+    if not files:
+        return pd.DataFrame(columns=columns)
+    return pd.concat([read_dataset(f, columns=columns) for f in files], ignore_index=True)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+
+Generates synthetic exports (synthetic_exports.py) at one or more sizes and
+runs the audit pipeline over them stage by stage: load, normalize, exclude
+(reference links and hold pairing), dedup, net_refunds, reconcile (exact and
+fuzzy matching against a perturbed copy of the audit, as analyze_paypal.py
+matches it against the exports), categorize (audit, transfer and dashboard
+rulesets) and dashboard (cube and embedded payload). Each stage is measured with instrumentation.RunReport
+(wall and CPU time, rows in and out, tracemalloc peak memory). Tracing slows
+allocation-heavy stages several times over, so memory is measured in a
+second pass and never distorts the timings.
+
+Results are written as JSON and can be compared against an earlier run:
+any stage that got slower or used more memory than the baseline by more
+than the threshold is flagged as a regression, and the script exits 1.
+
+Usage:
+    python3 benchmark.py --sizes 10k 100k --output benchmark_results.json
+    python3 benchmark.py --sizes 10k 100k --baseline benchmark_baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import create_complete_audit as complete_audit
+import create_july_dec_audit as july_dec_audit
+import prepare_dashboard_data as dashboard_data
+from dashboard_cube import build_cube, cube_payload, dashboard_rows, pareto
+from dashboard_payload import embed_json, encode_rows
+from instrumentation import RunReport
+from money import from_cents
+from reconciliation import reconcile_exact, reconcile_fuzzy
+from synthetic_exports import BUSINESS_FILE, CASHAPP_FILE, PERSONAL_FILE, generate_exports, parse_size
+from source_readers import read_cashapp, read_paypal_business, read_paypal_personal
+
+
+RESULTS_VERSION = 3
+
+DEFAULT_SIZES = ['10k', '100k']
+OUTPUT_FILE = 'benchmark_results.json'
+
+# Slowdown / memory growth over the baseline flagged as a regression
+REGRESSION_THRESHOLD = 0.25
+# Stages faster than this are too noisy to flag on time
+MIN_FLAGGED_SECONDS = 0.05
+
+# Reconcile stage source: share of audit rows dropped, a day off, and a few cents off
+PERTURB_DROPPED = 0.02
+PERTURB_DATE_SHIFTED = 0.10
+PERTURB_AMOUNT_SHIFTED = 0.05
+
+
+def run_stage(report, name, func, *args):
+    """Run one stage quietly as ``report.stage(name)``; rows are counted for frame inputs / outputs."""
+    rows_in = len(args[0]) if args and isinstance(args[0], pd.DataFrame) else None
+    with report.stage(name, rows_in=rows_in) as stage, contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+        stage.rows_out = len(result) if isinstance(result, pd.DataFrame) else None
+    return result
+
+
+def load_sources(data_dir):
+    """Read the three synthetic exports."""
+    return (read_paypal_personal(os.path.join(data_dir, PERSONAL_FILE)),
+            read_paypal_business(os.path.join(data_dir, BUSINESS_FILE)),
+            read_cashapp(os.path.join(data_dir, CASHAPP_FILE)))
+
+
+def normalize_sources(sources):
+    """Normalize each export and combine them."""
+    personal, business, cashapp = sources
+    return pd.concat([complete_audit.normalize_paypal_data(personal, 'Personal'),
+                      complete_audit.normalize_paypal_data(business, 'Business/Main'),
+                      complete_audit.normalize_cashapp_data(cashapp, 'Cash App')], ignore_index=True)
+
+
+def exclude_noise(df):
+    """Link reference chains, then exclude funding legs and paired holds."""
+    df[complete_audit.CLUSTER_COLUMN] = complete_audit.link_transactions(df)
+    df = complete_audit.exclude_linked_funding(df)
+    return complete_audit.exclude_paired_holds(df, complete_audit.HOLD_WINDOW)
+
+
+def net_refunds(df):
+    """Net refunds against their purchases."""
+    return complete_audit.net_refunded_purchases(df, complete_audit.REFUND_LOOKBACK)
+
+
+def perturbed_copy(df, seed=0):
+    """
+    Stand-in source export for the audit: a shuffled copy of its Date /
+    Amount_Cents with some rows dropped, some a day off and some a few cents off.
+    """
+    rng = np.random.default_rng(seed)
+    source = df[['Date', 'Amount_Cents']].sample(frac=1 - PERTURB_DROPPED, random_state=seed).reset_index(drop=True)
+    shifted = rng.random(len(source)) < PERTURB_DATE_SHIFTED
+    source.loc[shifted, 'Date'] += pd.to_timedelta(rng.choice([-1, 1], shifted.sum()), unit='D')
+    shifted = rng.random(len(source)) < PERTURB_AMOUNT_SHIFTED
+    source.loc[shifted, 'Amount_Cents'] += rng.integers(-5, 6, shifted.sum())
+    return source
+
+
+def reconcile(df, source):
+    """Exact, then fuzzy (default tolerances) matching of the audit against the source; returns the fuzzy pairs."""
+    keys = ['Date', 'Amount_Cents']
+    reconcile_exact(df, source, keys, keys)
+    matched, _, _ = reconcile_fuzzy(df, source, keys, keys)
+    return matched
+
+
+def categorize(df):
+    """Audit categories, transfer detection and dashboard groups, without on-disk caches."""
+    df['Category'] = complete_audit.categorize_transactions(df)
+    transfers = july_dec_audit.detect_transfers(df) & (df['Analysis_Status'] == 'Included (True Spend)')
+    df.loc[transfers, 'Analysis_Status'] = 'Excluded'
+    df[['Group', 'Dashboard_Category']] = dashboard_data.categorize_frame(df)
+    return df
+
+
+def build_dashboard(df):
+    """Dashboard rows, chart cube and embedded row payload (as JSON text)."""
+    included = df[(df['Analysis_Status'] == 'Included (True Spend)') & ~df['Group'].isin(['P2P Transfers', 'ATM/Cash'])]
+    rows = pd.DataFrame({'Date': included['Date'].dt.strftime('%m/%d/%Y'), 'Description': included['Name'],
+                         'Amount': from_cents(included['Net_Amount_Cents']), 'Group': included['Group'],
+                         'Category': included['Dashboard_Category']})
+    cube = build_cube(dashboard_rows(rows))
+    embed_json(cube_payload(cube, pareto(cube)))
+    embed_json(encode_rows(rows))
+    return rows
+
+
+def run_pipeline(data_dir, trace_memory=False):
+    """All stages over the exports in ``data_dir``; returns {stage: RunReport stage fields}."""
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        report = RunReport('benchmark')
+        run_stages(report, data_dir)
+    finally:
+        tracemalloc.stop()
+    return {stage.name: {key: value for key, value in stage.to_dict().items() if key not in ('name', 'detail')}
+            for stage in report.stages}
+
+
+def run_stages(report, data_dir):
+    """Run every stage in order."""
+    sources = run_stage(report, 'load', load_sources, data_dir)
+    report.stages[-1].rows_out = sum(len(df) for df in sources)
+    df = run_stage(report, 'normalize', normalize_sources, sources)
+    del sources
+    df = run_stage(report, 'exclude', exclude_noise, df)
+    df = run_stage(report, 'dedup', complete_audit.deduplicate_transactions, df)
+    df = run_stage(report, 'net_refunds', net_refunds, df)
+    run_stage(report, 'reconcile', reconcile, df, perturbed_copy(df))
+    df = run_stage(report, 'categorize', categorize, df)
+    run_stage(report, 'dashboard', build_dashboard, df)
+
+
+def environment():
+    """Versions and machine the results were measured on."""
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, min_seconds=MIN_FLAGGED_SECONDS):
+    """
+    Stages slower or hungrier than ``baseline`` by more than ``threshold``
+    (a fraction). Only sizes and stages present in both runs are compared.
+    Returns a list of {size, stage, metric, baseline, current, change}.
+    """
+    regressions = []
+    for size, run in results['runs'].items():
+        base_run = baseline.get('runs', {}).get(size)
+        if base_run is None:
+            continue
+        for stage, measured in run['stages'].items():
+            base = base_run['stages'].get(stage)
+            if base is None:
+                continue
+            for metric in ('wall_s', 'peak_mb'):
+                current, before = measured.get(metric), base.get(metric)
+                if current is None or not before:
+                    continue
+                if metric == 'wall_s' and max(current, before) < min_seconds:
+                    continue
+                change = current / before - 1
+                if change > threshold:
+                    regressions.append({'size': size, 'stage': stage, 'metric': metric,
+                                        'baseline': before, 'current': current, 'change': round(change, 3)})
+    return regressions
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Benchmark the audit pipeline on synthetic exports.")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help="Total export rows per run, e.g. 10k 100k 1M 10M (default: %(default)s)")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"Results file to write (default: {OUTPUT_FILE})")
+    parser.add_argument('--baseline', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Fractional slowdown / memory growth flagged as a regression (default: %(default)g)")
+    parser.add_argument('--data-dir',
+                        help="Keep generated exports here (one folder per size; reused when present) "
+                             "instead of a temporary directory")
+    parser.add_argument('--seed', type=int, default=0, help="Synthetic data seed (default: 0)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the tracemalloc pass (half the run time, no peak memory figures)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("="*60)
+    print("PIPELINE BENCHMARK")
+    print("="*60)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'environment': environment(),
+        'runs': {},
+    }
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in args.sizes:
+            rows = parse_size(size)
+            data_dir = os.path.join(args.data_dir or scratch, f'rows_{rows}')
+            if not os.path.exists(os.path.join(data_dir, PERSONAL_FILE)):
+                print(f"\nGenerating {rows:,} rows...")
+                generate_exports(rows, data_dir, seed=args.seed)
+
+            print(f"\nRunning pipeline on {rows:,} rows...")
+            stages = run_pipeline(data_dir)
+            if not args.no_memory:
+                for stage, measured in run_pipeline(data_dir, trace_memory=True).items():
+                    stages[stage]['peak_mb'] = measured['peak_mb']
+
+            results['runs'][str(rows)] = {
+                'rows': rows,
+                'stages': stages,
+                'wall_s': round(sum(stage['wall_s'] for stage in stages.values()), 4),
+            }
+            for stage, measured in stages.items():
+                peak = f"{measured['peak_mb']:9.1f} MB" if measured['peak_mb'] is not None else ''
+                print(f"  {stage:12s} {measured['wall_s']:9.3f} s {measured['cpu_s']:9.3f} s CPU {peak}")
+            print(f"  {'total':12s} {results['runs'][str(rows)]['wall_s']:9.3f} s")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        print("\n" + "="*60)
+        print(f"COMPARISON WITH {args.baseline}")
+        print("="*60)
+
+        if baseline.get('version') != RESULTS_VERSION:
+            print(f"⚠ {args.baseline} is results version {baseline.get('version')} (expected {RESULTS_VERSION}); "
+                  "re-create the baseline")
+            sys.exit(2)
+
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"⚠ REGRESSION {int(r['size']):,} rows / {r['stage']} {r['metric']}: "
+                  f"{r['baseline']} → {r['current']} (+{r['change']:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✓ No stage regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Shared Merchant Categorization Engine
+
+Compiles ordered keyword rules into a single matcher so a merchant name is
+scanned once, no matter how many rules or keywords there are. Whole columns
+can also be matched at once, one vectorized pass per rule over the distinct
+merchant names, with results memoized on disk per ruleset.
+
+Rules live in categorization_rules.toml. They are compiled once and pickled
+next to the rules file, and the artifact is reused until the file changes.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+
+CACHE_DIR = '.categorization_cache'
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'categorization_rules.toml')
+
+# Bump when MerchantMatcher internals change so stale artifacts are rebuilt
+ARTIFACT_VERSION = 1
+
+_loaded_rulesets = {}
+
+
+def lookup_array(values, default):
+    """Object array of per-rule values with the default appended (indexed by -1)."""
+    lookup = np.empty(len(values) + 1, dtype=object)
+    for position, value in enumerate(values):
+        lookup[position] = value
+    lookup[-1] = default
+    return lookup
+
+
+def _build_trie_pattern(keywords):
+    """Build a regex alternation factored as a trie (longest match wins)."""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def to_regex(node):
+        terminal = '' in node
+        branches = [re.escape(char) + to_regex(child)
+                    for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Optional (greedy) groups try the longer keyword before the shorter one
+        return f'(?:{body})?' if terminal else body
+
+    return to_regex(trie)
+
+
+class MerchantMatcher:
+    """
+    First-match-wins keyword matcher over an ordered list of rules.
+
+    Each rule is a tuple ``(label, keywords)`` or ``(label, keywords, unless)``.
+    A rule matches when any of its keywords is a substring of the name and
+    none of its ``unless`` keywords is. A keyword starting with ``^`` only
+    matches at the start of the name. Names are expected to be lowercased.
+    """
+
+    _ANCHOR = '\x00'
+
+    def __init__(self, rules, default=None):
+        self.rules = [tuple(rule) for rule in rules]
+        self.labels = [rule[0] for rule in self.rules]
+        self.default = default
+
+        # Map every keyword to bitmasks of the rules it triggers / vetoes
+        include_bits = {}
+        exclude_bits = {}
+        for index, rule in enumerate(self.rules):
+            for keyword in rule[1]:
+                keyword = self._anchor(keyword)
+                include_bits[keyword] = include_bits.get(keyword, 0) | (1 << index)
+            for keyword in (rule[2] if len(rule) > 2 else ()):
+                keyword = self._anchor(keyword)
+                exclude_bits[keyword] = exclude_bits.get(keyword, 0) | (1 << index)
+
+        keywords = set(include_bits) | set(exclude_bits)
+
+        # A hit on a keyword is also a hit on every keyword that is its prefix,
+        # so the regex only needs to report the longest keyword per position.
+        self._hit_masks = {}
+        for keyword in keywords:
+            include, exclude = 0, 0
+            for other in keywords:
+                if keyword.startswith(other):
+                    include |= include_bits.get(other, 0)
+                    exclude |= exclude_bits.get(other, 0)
+            self._hit_masks[keyword] = (include, exclude)
+
+        self._pattern = re.compile('(?=(' + _build_trie_pattern(keywords) + '))') if keywords else None
+
+        self.fingerprint = hashlib.sha256(
+            json.dumps([self.rules, self.default], sort_keys=True, default=list).encode('utf-8')
+        ).hexdigest()[:16]
+
+        # One alternation per rule for column-at-a-time matching
+        self._rule_patterns = [
+            (self._rule_regex(rule[1]), self._rule_regex(rule[2]) if len(rule) > 2 else None)
+            for rule in self.rules
+        ]
+
+    @classmethod
+    def _anchor(cls, keyword):
+        return cls._ANCHOR + keyword[1:] if keyword.startswith('^') else keyword
+
+    @staticmethod
+    def _rule_regex(keywords):
+        parts = ['^' + re.escape(kw[1:]) if kw.startswith('^') else re.escape(kw) for kw in keywords]
+        return '|'.join(parts) if parts else None
+
+    def match_index(self, name):
+        """Return the index of the first matching rule, or -1 if none match."""
+        if self._pattern is None or not name:
+            return -1
+
+        include, exclude = 0, 0
+        for hit in self._pattern.finditer(self._ANCHOR + name):
+            hit_include, hit_exclude = self._hit_masks[hit.group(1)]
+            include |= hit_include
+            exclude |= hit_exclude
+
+        matched = include & ~exclude
+        if not matched:
+            return -1
+        return (matched & -matched).bit_length() - 1
+
+    def match(self, name):
+        """Return the label of the first matching rule, or the default."""
+        index = self.match_index(name)
+        return self.default if index < 0 else self.labels[index]
+
+    def match_indices(self, names, cache=None):
+        """
+        Vectorized match over a Series of lowercased names.
+
+        Each distinct name is classified once (or looked up in ``cache``) and
+        the result is mapped back to every row. Returns an integer array with
+        the first matching rule index per name, or -1 where no rule matches.
+        """
+        names = pd.Series(names, copy=False).fillna('').astype(str)
+        codes, uniques = pd.factorize(names)
+        uniques = pd.Series(uniques, dtype=object)
+        if cache is None:
+            unique_indices = self._match_column(uniques)
+        else:
+            unique_indices = cache.lookup(uniques, self._match_column)
+        return unique_indices[codes]
+
+    def _match_column(self, names):
+        conditions = []
+        for include, exclude in self._rule_patterns:
+            mask = names.str.contains(include, regex=True).to_numpy(dtype=bool) if include else np.zeros(len(names), dtype=bool)
+            if exclude:
+                mask = mask & ~names.str.contains(exclude, regex=True).to_numpy(dtype=bool)
+            conditions.append(mask)
+        if not conditions:
+            return np.full(len(names), -1)
+        return np.select(conditions, np.arange(len(conditions)), default=-1)
+
+    def match_labels(self, names, cache=None):
+        """Vectorized match returning an object array of labels (default where unmatched)."""
+        return lookup_array(self.labels, self.default)[self.match_indices(names, cache=cache)]
+
+
+class CategorizationCache:
+    """
+    On-disk memo of normalized merchant name -> rule index for one ruleset.
+
+    The file is keyed by the matcher fingerprint, so editing the rules starts
+    a fresh cache while a rerun with unchanged rules classifies nothing.
+    """
+
+    def __init__(self, matcher, cache_dir=CACHE_DIR):
+        self.path = os.path.join(cache_dir, f'{matcher.fingerprint}.json')
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def lookup(self, names, classify):
+        """Rule indices for distinct ``names``, classifying only unseen ones."""
+        indices = names.map(self.entries)
+        missing = indices.isna().to_numpy()
+        self.misses += int(missing.sum())
+        self.hits += int(len(names) - missing.sum())
+        if missing.any():
+            new_names = names[missing]
+            new_indices = classify(new_names)
+            self.entries.update(zip(new_names.tolist(), new_indices.tolist()))
+            indices[missing] = new_indices
+            self._dirty = True
+        return indices.to_numpy(dtype=int)
+
+    def save(self):
+        """Write new entries back to disk (atomically) if anything changed."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def _as_label(value):
+    """TOML arrays become tuples so labels stay hashable."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def compile_rulesets(rules_text):
+    """Compile every ruleset in a TOML rules document into a MerchantMatcher."""
+    matchers = {}
+    for name, section in tomllib.loads(rules_text).items():
+        rules = []
+        for rule in section.get('rules', []):
+            entry = (_as_label(rule['label']), rule['keywords'])
+            if rule.get('unless'):
+                entry += (rule['unless'],)
+            rules.append(entry)
+        matchers[name] = MerchantMatcher(rules, default=_as_label(section.get('default')))
+    return matchers
+
+
+def load_rulesets(path=RULES_FILE):
+    """
+    Return {ruleset name: MerchantMatcher} for a rules file.
+
+    The compiled matchers are pickled next to the rules file and reused for
+    as long as the rules file content hash (and ARTIFACT_VERSION) match.
+    """
+    path = os.path.abspath(path)
+    if path in _loaded_rulesets:
+        return _loaded_rulesets[path]
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+    artifact_path = os.path.splitext(path)[0] + '.compiled.pickle'
+
+    matchers = None
+    if os.path.exists(artifact_path):
+        try:
+            with open(artifact_path, 'rb') as f:
+                artifact = pickle.load(f)
+            if (artifact.get('version'), artifact.get('source_hash')) == (ARTIFACT_VERSION, source_hash):
+                matchers = artifact['matchers']
+        except Exception:
+            # Unreadable or from an incompatible version of this module: recompile
+            matchers = None
+
+    if matchers is None:
+        matchers = compile_rulesets(raw.decode('utf-8'))
+        artifact = {'version': ARTIFACT_VERSION, 'source_hash': source_hash, 'matchers': matchers}
+        try:
+            tmp_path = artifact_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, artifact_path)
+        except OSError as e:
+            print(f"Warning: Could not save compiled rules to {artifact_path}: {e}")
+
+    _loaded_rulesets[path] = matchers
+    return matchers
+
+
+def load_matcher(name, path=RULES_FILE):
+    """Compiled matcher for one named ruleset (e.g. 'audit', 'dashboard', 'transfers')."""
+    return load_rulesets(path)[name]
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Complete Audit Creation Script
+
+This script combines PayPal and Cash App transaction data into a single
+deduplicated, cleaned audit file following the documented cleaning logic.
+
+Amounts are integer cents (Amount_Cents / Net_Amount_Cents) from ingestion
+until the audit is written, where they become the Amount / Net_Amount
+dollar columns.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import sys
+import tracemalloc
+
+from audit_storage import assign_label, expand_frame, label_counts, to_storage_dtypes, write_partitioned
+from categorization import load_matcher
+from deduplication import CLUSTER_COLUMN, deduplicate
+from hold_pairing import HOLD_WINDOW, PAIRED_REASON, paired_hold_legs
+from instrumentation import RunReport, add_report_arguments, finish_report, start_report
+from linking import link_transactions, linked_funding_legs
+from refunds import REFUND_LOOKBACK, net_refunds
+from money import CENTS_SUFFIX, parse_cents
+from source_readers import read_cashapp, read_paypal_business, read_paypal_personal
+
+
+PERSONAL_FILE = 'personal-6.CSV'
+BUSINESS_FILE = 'Download-6.CSV'
+CASHAPP_PATTERN = 'cash_app_report_*.csv'
+
+# Shared with create_july_dec_audit.py (categorization_rules.toml)
+CATEGORY_MATCHER = load_matcher('audit')
+
+
+def load_source(reader, filepath):
+    """Load a source export with its schema-aware reader, or None on failure."""
+    try:
+        return reader(filepath)
+    except Exception as e:
+        print(f"Warning: Could not load {filepath}: {e}")
+        return None
+
+
+def ingest_source(task):
+    """
+    Load and normalize one source file (runs in a worker process).
+
+    ``task`` is ``(kind, filepath, source_name, trace_memory)`` with kind
+    'personal', 'business' or 'cashapp'. Returns ``(normalized frame or None,
+    log text, stage records)``; console output is captured so the parent can
+    print it in source order, and the load / normalize timings are returned
+    for the parent's run report.
+    """
+    kind, filepath, source_name, trace_memory = task
+    reader = {'personal': read_paypal_personal, 'business': read_paypal_business, 'cashapp': read_cashapp}[kind]
+    normalize = normalize_cashapp_data if kind == 'cashapp' else normalize_paypal_data
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    report = RunReport('ingest_source')
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        with report.stage('load', detail=source_name) as stage:
+            df = load_source(reader, filepath)
+            stage.rows_out = len(df) if df is not None else 0
+        normalized = None
+        if df is not None:
+            with report.stage(f'normalize_{"cashapp" if kind == "cashapp" else "paypal"}_data', rows_in=len(df),
+                              detail=source_name) as stage:
+                normalized = normalize(df, source_name)
+                stage.rows_out = len(normalized)
+    if started_tracing:
+        tracemalloc.stop()
+    return normalized, log.getvalue(), [stage.to_dict() for stage in report.stages]
+
+
+def ingest_sources(tasks, workers):
+    """Run ingest_source over all tasks, in parallel when workers > 1 (results in task order)."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [ingest_source(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(ingest_source, tasks))
+
+
+def normalize_paypal_data(df, source_name):
+    """Normalize PayPal data to common format."""
+    print(f"\nProcessing {source_name}...")
+    print(f"  Initial transactions: {len(df)}")
+
+    # Determine amount column (Personal uses 'Total', Business uses 'Net'), parsed to cents by the reader
+    amount_col = ('Net' if 'Net' + CENTS_SUFFIX in df.columns else 'Total') + CENTS_SUFFIX
+
+    # Create normalized dataframe
+    normalized = pd.DataFrame()
+    normalized['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    normalized['Timestamp'] = normalized['Date'] + pd.to_timedelta(df['Time'], errors='coerce') if 'Time' in df else normalized['Date']
+    normalized['Name'] = df['Name']
+    normalized['Amount_Cents'] = df[amount_col]
+    normalized['Type'] = df['Type']
+    normalized['Status'] = df['Status']
+    normalized['Source'] = source_name
+    normalized['Transaction_ID'] = df.get('Transaction ID', '')
+    normalized['Reference_ID'] = df.get('Reference Txn ID')
+
+    # Apply exclusion logic
+    normalized['Analysis_Status'] = 'Included (True Spend)'
+    normalized['Exclusion_Reason'] = ''
+    normalized['Category'] = 'Other/Uncategorized'
+
+    # Exclude non-finalized transactions
+    failed_statuses = ['Denied', 'Pending', 'Reversed', 'Canceled', 'Removed', 'Refunded']
+    for status in failed_statuses:
+        mask = normalized['Status'] == status
+        normalized.loc[mask, 'Analysis_Status'] = 'Excluded'
+        normalized.loc[mask, 'Exclusion_Reason'] = f'Non-Finalized (Status: {status})'
+        normalized.loc[mask, 'Category'] = 'Excluded'
+
+    # Exclude money in / refunds (positive amounts; missing amounts are neither in nor out)
+    is_money_in = normalized['Amount_Cents'].fillna(0) > 0
+    money_in_mask = is_money_in & (normalized['Analysis_Status'] == 'Included (True Spend)')
+    normalized.loc[money_in_mask, 'Analysis_Status'] = 'Excluded'
+    normalized.loc[money_in_mask, 'Exclusion_Reason'] = 'Money In / Refund'
+    normalized.loc[money_in_mask, 'Category'] = 'Excluded'
+
+    # Exclude transfers/noise (specific types)
+    transfer_types = ['General Payment', 'Mobile Payment']  # When both positive and negative amounts for same person
+    # More sophisticated logic: transfers between same parties on same day
+
+    print(f"  After exclusions: {len(normalized[normalized['Analysis_Status'] == 'Included (True Spend)'])} included")
+
+    return normalized
+
+
+def normalize_cashapp_data(df, source_name):
+    """Normalize Cash App data to common format."""
+    print(f"\nProcessing {source_name}...")
+    print(f"  Initial transactions: {len(df)}")
+
+    # Create normalized dataframe
+    normalized = pd.DataFrame()
+
+    # Parse date (Cash App format: "YYYY-MM-DD HH:MM:SS TZ")
+    normalized['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    normalized['Timestamp'] = normalized['Date']
+
+    # Amounts in cents (parsed by the reader unless given as text; blanks count as 0)
+    cents_col = 'Net Amount' + CENTS_SUFFIX
+    cents = df[cents_col] if cents_col in df.columns else parse_cents(df['Net Amount'])
+    normalized['Amount_Cents'] = cents.fillna(0).astype('int64')
+    normalized['Name'] = df['Notes']  # Merchant/recipient is in Notes
+    normalized['Type'] = df['Transaction Type']
+    normalized['Status'] = df['Status']
+    normalized['Source'] = source_name
+    normalized['Transaction_ID'] = df.get('Transaction ID', '')
+
+    # Apply exclusion logic
+    normalized['Analysis_Status'] = 'Included (True Spend)'
+    normalized['Exclusion_Reason'] = ''
+    normalized['Category'] = 'Other/Uncategorized'
+
+    # Exclude non-finalized transactions
+    failed_statuses = ['FAILED', 'WAITING_ON_RECIPIENT', 'REFUNDED', 'CANCELED']
+    for status in failed_statuses:
+        mask = normalized['Status'] == status
+        normalized.loc[mask, 'Analysis_Status'] = 'Excluded'
+        normalized.loc[mask, 'Exclusion_Reason'] = f'Non-Finalized (Status: {status})'
+        normalized.loc[mask, 'Category'] = 'Excluded'
+
+    # Exclude money in / refunds (positive amounts; missing amounts are neither in nor out)
+    is_money_in = normalized['Amount_Cents'].fillna(0) > 0
+    money_in_mask = is_money_in & (normalized['Analysis_Status'] == 'Included (True Spend)')
+    normalized.loc[money_in_mask, 'Analysis_Status'] = 'Excluded'
+    normalized.loc[money_in_mask, 'Exclusion_Reason'] = 'Money In / Refund'
+    normalized.loc[money_in_mask, 'Category'] = 'Excluded'
+
+    # Exclude transfers/noise
+    noise_types = ['Account Notifications', 'Deposits', 'Withdrawal']
+    noise_mask = normalized['Type'].isin(noise_types) & (normalized['Analysis_Status'] == 'Included (True Spend)')
+    normalized.loc[noise_mask, 'Analysis_Status'] = 'Excluded'
+    normalized.loc[noise_mask, 'Exclusion_Reason'] = 'Transfer / Noise'
+    normalized.loc[noise_mask, 'Category'] = 'Excluded'
+
+    # Exclude P2P transfers (peer-to-peer, not merchant spending)
+    p2p_mask = (normalized['Type'] == 'P2P') & (normalized['Analysis_Status'] == 'Included (True Spend)')
+    normalized.loc[p2p_mask, 'Analysis_Status'] = 'Excluded'
+    normalized.loc[p2p_mask, 'Exclusion_Reason'] = 'Transfer / Noise'
+    normalized.loc[p2p_mask, 'Category'] = 'Excluded'
+
+    print(f"  After exclusions: {len(normalized[normalized['Analysis_Status'] == 'Included (True Spend)'])} included")
+
+    return normalized
+
+
+def categorize_transactions(df):
+    """Categorize included transactions with the shared audit ruleset."""
+    names = df['Name'].fillna('').astype(str).str.lower()
+    categories = CATEGORY_MATCHER.match_labels(names)
+    excluded = (df['Analysis_Status'] == 'Excluded').to_numpy()
+    return pd.Series(np.where(excluded, 'Excluded', categories), index=df.index)
+
+
+def exclude_linked_funding(df):
+    """Exclude card/bank funding legs linked by reference ID to the payment they funded."""
+    funding_mask = linked_funding_legs(df, df[CLUSTER_COLUMN]) & (df['Analysis_Status'] == 'Included (True Spend)')
+    assign_label(df, funding_mask, 'Analysis_Status', 'Excluded')
+    assign_label(df, funding_mask, 'Exclusion_Reason', 'Funding Leg (Linked)')
+    assign_label(df, funding_mask, 'Category', 'Excluded')
+    print(f"  Funding legs excluded: {int(funding_mask.sum())}")
+    return df
+
+
+def exclude_paired_holds(df, window):
+    """Exclude hold / reversal legs paired with the charge they guard."""
+    paired_mask = paired_hold_legs(df, window)
+    assign_label(df, paired_mask, 'Analysis_Status', 'Excluded')
+    assign_label(df, paired_mask, 'Exclusion_Reason', PAIRED_REASON)
+    assign_label(df, paired_mask, 'Category', 'Excluded')
+    print(f"  Hold / reversal legs paired: {int(paired_mask.sum())}")
+    return df
+
+
+def net_refunded_purchases(df, lookback):
+    """Net merchant refunds against their purchases (adds Net_Amount_Cents)."""
+    refunded, matches = net_refunds(df, lookback)
+    df['Net_Amount_Cents'] = df['Amount_Cents'] + refunded
+
+    netted = df.index.isin(matches['refund_index'])
+    assign_label(df, netted, 'Exclusion_Reason', 'Refund (Netted)')
+
+    partial = matches['partial']
+    print(f"  Full refunds netted: {int((~partial).sum())} (${matches.loc[~partial, 'cents'].sum() / 100:,.2f})")
+    print(f"  Partial refunds netted: {int(partial.sum())} (${matches.loc[partial, 'cents'].sum() / 100:,.2f})")
+    return df
+
+
+def deduplicate_transactions(df):
+    """Remove duplicate transactions (paired hold legs are kept with their exclusion reason)."""
+    print("\nDeduplicating transactions...")
+
+    df, removed = deduplicate(df, keep=df['Exclusion_Reason'] == PAIRED_REASON)
+    for rule, count in removed.items():
+        print(f"  {rule}: {count} removed")
+
+    print(f"  Removed {sum(removed.values())} duplicates")
+    print(f"  Remaining transactions: {len(df)}")
+
+    return df
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build the complete PayPal + Cash App audit.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes used to load and normalize source files (1 = sequential; default: CPU count)")
+    parser.add_argument('--refund-lookback-days', type=float, default=REFUND_LOOKBACK / pd.Timedelta(days=1),
+                        help="Max days between a purchase and the refund netted against it (default: %(default)g)")
+    parser.add_argument('--hold-window-minutes', type=float, default=HOLD_WINDOW / pd.Timedelta(minutes=1),
+                        help="Max minutes between a hold/reversal leg and its charge (default: %(default)g)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Hold low-cardinality labels (status, source, type, ...) as categoricals while processing")
+    add_report_arguments(parser)
+    parser.add_argument('--partition-dir',
+                        help="Also store the audit partitioned by month in this directory (one month=YYYY-MM "
+                             "folder per month) so later audits read only the months they need")
+    parser.add_argument('--partition-format', choices=['csv', 'parquet', 'feather'], default='parquet',
+                        help="File format of the month partitions (columnar formats need pyarrow; default: parquet)")
+    return parser.parse_args()
+
+
+def main():
+    """Main audit creation function."""
+    args = parse_args()
+    report = start_report('create_complete_audit', args)
+
+    print("="*60)
+    print("COMPLETE AUDIT CREATION")
+    print("="*60)
+    print(f"Processing Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # One task per source file; each worker loads and normalizes its file
+    tasks = [('personal', PERSONAL_FILE, 'Personal'), ('business', BUSINESS_FILE, 'Business/Main')]
+    tasks += [('cashapp', path, 'Cash App') for path in sorted(glob.glob(CASHAPP_PATTERN))]
+    tasks = [task + (args.trace_memory,) for task in tasks]
+
+    print("\n" + "="*60)
+    print("LOADING AND NORMALIZING SOURCE FILES")
+    print("="*60)
+    print(f"{len(tasks)} source files across {max(1, min(args.workers, len(tasks)))} worker(s)")
+
+    results = ingest_sources(tasks, args.workers)
+    for _, log, stages in results:
+        print(log, end='')
+        report.extend(stages)
+
+    # Both PayPal exports are required
+    if results[0][0] is None or results[1][0] is None:
+        print("Error: Could not load required PayPal files")
+        sys.exit(1)
+
+    all_transactions = [normalized for normalized, _, _ in results if normalized is not None]
+
+    # Combine all transactions
+    print("\n" + "="*60)
+    print("COMBINING ALL SOURCES")
+    print("="*60)
+
+    with report.stage('combine', rows_in=sum(len(df) for df in all_transactions)) as stage:
+        combined_df = pd.concat(all_transactions, ignore_index=True)
+        if args.compact:
+            combined_df = to_storage_dtypes(combined_df)
+        stage.rows_out = len(combined_df)
+    print(f"Total combined transactions: {len(combined_df)}")
+    print(f"  Included: {len(combined_df[combined_df['Analysis_Status'] == 'Included (True Spend)'])}")
+    print(f"  Excluded: {len(combined_df[combined_df['Analysis_Status'] == 'Excluded'])}")
+
+    # Resolve Reference Txn ID chains into clusters of related rows
+    print("\nLinking transactions by reference ID...")
+    with report.stage('link_transactions', rows_in=len(combined_df)) as stage:
+        combined_df[CLUSTER_COLUMN] = link_transactions(combined_df)
+        stage.rows_out = len(combined_df)
+    cluster_sizes = combined_df[CLUSTER_COLUMN].value_counts()
+    print(f"  Linked clusters: {int((cluster_sizes > 1).sum())} ({int(cluster_sizes[cluster_sizes > 1].sum())} rows)")
+    with report.stage('exclude_linked_funding', rows_in=len(combined_df)) as stage:
+        combined_df = exclude_linked_funding(combined_df)
+        stage.rows_out = len(combined_df)
+
+    # Pair hold / reversal legs with the charge they guard
+    print("\nPairing holds and reversals...")
+    with report.stage('exclude_paired_holds', rows_in=len(combined_df)) as stage:
+        combined_df = exclude_paired_holds(combined_df, pd.Timedelta(minutes=args.hold_window_minutes))
+        stage.rows_out = len(combined_df)
+
+    # Deduplicate
+    with report.stage('deduplicate_transactions', rows_in=len(combined_df)) as stage:
+        combined_df = deduplicate_transactions(combined_df)
+        stage.rows_out = len(combined_df)
+
+    # Net refunds against the purchases they reverse
+    print("\nNetting refunds...")
+    with report.stage('net_refunded_purchases', rows_in=len(combined_df)) as stage:
+        combined_df = net_refunded_purchases(combined_df, pd.Timedelta(days=args.refund_lookback_days))
+        stage.rows_out = len(combined_df)
+
+    # Apply categorization to included transactions
+    print("\n" + "="*60)
+    print("CATEGORIZING TRANSACTIONS")
+    print("="*60)
+
+    with report.stage('categorize_transactions', rows_in=len(combined_df)) as stage:
+        combined_df['Category'] = categorize_transactions(combined_df)
+        if args.compact:
+            combined_df['Category'] = combined_df['Category'].astype('category')
+        stage.rows_out = len(combined_df)
+
+    # Show category breakdown
+    print("\nCategory Breakdown (Included only):")
+    included_df = combined_df[combined_df['Analysis_Status'] == 'Included (True Spend)']
+    print(label_counts(included_df['Category']))
+
+    with report.stage('write', rows_in=len(combined_df)) as stage:
+        # Format date for output (MM/DD/YYYY)
+        combined_df['Date'] = combined_df['Date'].dt.strftime('%m/%d/%Y')
+
+        # Prepare final output columns (amounts back to dollars)
+        output_df = expand_frame(combined_df[['Date', 'Name', 'Amount_Cents', 'Net_Amount_Cents', 'Analysis_Status',
+                                              'Exclusion_Reason', 'Category', 'Source', 'Type', 'Status']])
+
+        # Sort by date (most recent first)
+        output_df = output_df.sort_values('Date', ascending=False)
+
+        # Save complete audit
+        output_file = 'Complete_Audit_PayPal_CashApp.csv'
+        output_df.to_csv(output_file, index=False)
+        if args.partition_dir:
+            write_partitioned(output_df, args.partition_dir, pd.to_datetime(output_df['Date'], format='%m/%d/%Y'),
+                              args.partition_format)
+        stage.rows_out = len(output_df)
+
+    # Summary statistics
+    print("\n" + "="*60)
+    print("FINAL SUMMARY")
+    print("="*60)
+
+    print(f"\n✓ Total transactions processed: {len(output_df)}")
+    print(f"✓ Included (True Spend): {len(output_df[output_df['Analysis_Status'] == 'Included (True Spend)'])}")
+    print(f"✓ Excluded: {len(output_df[output_df['Analysis_Status'] == 'Excluded'])}")
+
+    print(f"\nSource Breakdown:")
+    print(label_counts(output_df['Source']))
+
+    print(f"\nExclusion Reasons:")
+    excluded_df = output_df[output_df['Analysis_Status'] == 'Excluded']
+    print(label_counts(excluded_df['Exclusion_Reason']))
+
+    # Calculate total spending
+    included_output = combined_df[combined_df['Analysis_Status'] == 'Included (True Spend)']
+    true_spend = included_output['Net_Amount_Cents'].sum() / 100
+    print(f"\n💰 Total True Spend: ${true_spend:,.2f}")
+    print(f"   (before refunds: ${included_output['Amount_Cents'].sum() / 100:,.2f})")
+
+    print(f"\n✓ Complete audit saved to: {output_file}")
+    if args.partition_dir:
+        print(f"✓ Month partitions saved to: {args.partition_dir}/")
+    print("✓ Analysis complete!")
+
+    finish_report(report, args)
+
+
+if __name__ == "__main__":
+    main()
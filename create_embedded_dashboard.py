@@ -3,17 +3,68 @@
 Create dashboard with embedded data - no file upload needed
 """
 
-import pandas as pd
+import argparse
 import json
+import os
 
-# Read CSV data
-df = pd.read_csv('dashboard_data.csv')
+import pandas as pd
 
-# Convert to list of dicts for JavaScript
-data_array = df.to_dict('records')
+from create_july_dec_audit import covered_months, period_label
+from dashboard_payload import embed_json, encode_rows, json_script, month_shards, shard_manifest
+from instrumentation import add_report_arguments, finish_report, start_report
+
+parser = argparse.ArgumentParser(description="Create the dashboard with embedded data.")
+parser.add_argument('--compress', action='store_true',
+                    help="Embed data gzip+base64 compressed (needs a browser with DecompressionStream)")
+parser.add_argument('--shard', action='store_true',
+                    help="Embed one payload per month; the dashboard decodes only the months selected")
+parser.add_argument('--shard-dir',
+                    help="Write per-month shards and manifest.json to this directory instead of embedding "
+                         "them (the dashboard fetches them, so serve it over HTTP)")
+add_report_arguments(parser)
+args = parser.parse_args()
+report = start_report('create_embedded_dashboard', args)
 
-# Convert to JavaScript array string
-js_data = json.dumps(data_array, indent=2)
+# Read CSV data
+with report.stage('load') as stage:
+    df = pd.read_csv('dashboard_data.csv')
+    stage.rows_out = len(df)
+
+# Header label for the months in the data (e.g. 'July-Dec 2025')
+period = period_label(covered_months(pd.to_datetime(df['Date'], format='mixed', errors='coerce'), None, None))
+
+with report.stage('encode', rows_in=len(df)) as stage:
+    cube_file = 'dashboard_cube.json'
+    has_cube = False
+    if args.shard or args.shard_dir:
+        # Per-month shards plus a manifest; charts aggregate the selected months in the browser
+        shards = month_shards(df)
+        files = None
+        if args.shard_dir:
+            os.makedirs(args.shard_dir, exist_ok=True)
+            files = {}
+            for month, payload in shards.items():
+                with open(os.path.join(args.shard_dir, f'{month}.json'), 'w', encoding='utf-8') as f:
+                    f.write(embed_json(payload, compress=args.compress))
+                files[month] = f'{os.path.relpath(args.shard_dir).replace(os.sep, "/")}/{month}.json'
+        manifest = shard_manifest(shards, files=files)
+        data_tags = json_script('embeddedManifest', manifest)
+        if files:
+            with open(os.path.join(args.shard_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, separators=(',', ':'))
+        else:
+            for month, payload in shards.items():
+                data_tags += json_script(f'shard-{month}', payload, compress=args.compress)
+    else:
+        # Columnar, dictionary-encoded rows (see dashboard_payload.py)
+        data_tags = json_script('embeddedData', encode_rows(df), compress=args.compress)
+
+        # Pre-aggregated chart totals from prepare_dashboard_data.py (rolled up in the browser if missing)
+        has_cube = os.path.exists(cube_file)
+        if has_cube:
+            with open(cube_file, 'r', encoding='utf-8') as f:
+                data_tags += json_script('embeddedCube', json.load(f), compress=args.compress)
+    stage.rows_out = len(df)
 
 # Read the template HTML
 with open('unified-dashboard-ultimate.html', 'r', encoding='utf-8') as f:
@@ -72,32 +123,40 @@ old_init = '''  init() {
 
 # New version that loads embedded data directly
 new_init = f'''  init() {{
-    // Embedded data - no file upload needed
-    const embeddedData = {js_data};
-
-    const status = document.getElementById('statusMsg');
-    status.innerText = "Loading...";
-
-    this.processRows(embeddedData);
-    status.innerText = `Loaded ${{this.data.length}} transactions • July-Dec 2025`;
+    // Embedded data - no file upload needed; decoded in a background worker
+    this.loadEmbedded({json.dumps(' • ' + period, ensure_ascii=False)});
   }},'''
 
 html = html.replace(old_init, new_init)
 
-# Write the new HTML
-output_file = 'spending-dashboard.html'
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write(html)
+with report.stage('html', rows_in=len(df)) as stage:
+    # Embed the data as JSON elements the page does not parse as script
+    html = html.replace('<script>\nconst App = {', data_tags + '<script>\nconst App = {')
+
+    # Write the new HTML
+    output_file = 'spending-dashboard.html'
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    stage.rows_out = len(df)
 
 print("="*60)
 print("✅ DASHBOARD CREATED WITH EMBEDDED DATA")
 print("="*60)
 print(f"\\nFile: {output_file}")
-print(f"Transactions: {len(df)}")
+print(f"Transactions: {len(df)} ({period})")
 print(f"Total Amount: ${abs(df['Amount'].sum()):,.2f}")
+print(f"Embedded data: {len(data_tags):,} characters{' (compressed)' if args.compress else ''}")
+print(f"Chart cube: {cube_file if has_cube else 'built in browser'}")
+if args.shard or args.shard_dir:
+    print(f"Month shards: {len(manifest['months'])} ({manifest['months'][0]} to {manifest['months'][-1]})"
+          if manifest['months'] else "Month shards: none")
+    if args.shard_dir:
+        print(f"Shard files: {args.shard_dir}/ (serve over HTTP, e.g. python3 -m http.server)")
 print(f"\\n✓ No file upload needed")
 print(f"✓ Data embedded directly")
 print(f"✓ Works offline")
 print(f"✓ Mobile Safari compatible")
 print(f"\\nJust open: {output_file}")
 print("="*60)
+
+finish_report(report, args)
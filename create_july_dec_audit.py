@@ -2,35 +2,60 @@
 """
 Final Corrected Audit - July to December 2025
 With Updated Categorizations: CLEO AI (rental car) and Insurance under Transportation
+
+Other periods can be selected with --start / --end. When the complete audit
+is stored partitioned by month (create_complete_audit.py --partition-dir),
+only the months in the window are read.
+
+Amounts are held in integer cents and written back as dollars. --compact
+also holds categorical labels and one datetime Date column; the derived
+Date_parsed / Month / MonthName / MonthNum columns are only added when the
+audit is written.
 """
 
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
-import re
-from datetime import datetime
 
+from audit_storage import (append_dataset, assign_label, compact_frame, expand_frame, is_partitioned, label_counts,
+                           read_dataset, read_partitioned, to_cents_columns, with_extension, write_dataset)
+from categorization import CategorizationCache, load_matcher
+from instrumentation import add_report_arguments, finish_report, start_report
+from money import CENTS_SUFFIX
 
-def is_transfer(row):
-    """Detect if a transaction is actually a transfer (not spending)."""
-    name = str(row['Name']).lower() if pd.notna(row['Name']) else ''
 
-    # Apple Cash transfers
-    apple_cash_transfers = [
-        'apple cash balance add',
-        'apple cash sent money',
-        'apple cash inst xfer',
-    ]
-    if any(transfer in name for transfer in apple_cash_transfers):
-        return True
+# Rulesets live in categorization_rules.toml
+TRANSFER_MATCHER = load_matcher('transfers')
+CATEGORY_MATCHER = load_matcher('audit')
+
+INPUT_FILE = 'Complete_Audit_PayPal_CashApp.csv'
+OUTPUT_FILE = 'July_December_2025_Audit.csv'
 
-    # REB NYC (rent/recurring transfers)
-    if 'reb nyc' in name:
-        return True
+# Default audit window (inclusive months; end None = through the latest data)
+DEFAULT_START = '2025-07'
+DEFAULT_END = None
 
-    # P2P transfers
-    if 'aizihaer' in name or 'cash app*aizihaer' in name:
-        return True
+# Refund-netted amount written by create_complete_audit.py (Amount when absent)
+NET_AMOUNT_COLUMN = 'Net_Amount'
 
-    return False
+# Audit date format (Date column of the complete audit and of the output)
+DATE_FORMAT = '%m/%d/%Y'
+
+# Fingerprints of the rows in the output audit, in row order (for --incremental).
+# They cover the source fields and what create_complete_audit.py derives from
+# them, so a row re-netted or re-excluded upstream is rewritten.
+WATERMARK_SUFFIX = '.watermark.npz'
+WATERMARK_VERSION = 2
+FINGERPRINT_COLUMNS = ['Date', 'Name', 'Amount', 'Type', 'Status', 'Source', NET_AMOUNT_COLUMN, 'Analysis_Status',
+                       'Exclusion_Reason']
+
+
+def is_transfer(row):
+    """Detect if a transaction is actually a transfer (not spending)."""
+    name = str(row['Name']).lower() if pd.notna(row['Name']) else ''
+    return TRANSFER_MATCHER.match(name)
 
 
 def categorize_transaction(row):
@@ -39,245 +64,345 @@ def categorize_transaction(row):
         return 'Excluded'
 
     name = str(row['Name']).lower() if pd.notna(row['Name']) else ''
-
-    # Transportation (UPDATED - includes CLEO AI and Insurance)
-    transport_keywords = [
-        'uber', 'lyft', 'taxi', 'mta', 'transit', 'metrocard', 'parking',
-        'citibik', 'citi bike', 'bike', 'curb mobility', 'via',
-        'juno', 'car rental', 'joulez', 'hertz', 'enterprise', 'avis',
-        'revel', 'shell', 'exxon', 'chevron', 'bp', 'mobil', 'conoco',
-        'sunoco', 'gulf', 'arco', 'marathon', 'speedway',
-        'cleo ai',  # NEW: Rental car service
-        'insurance', 'allianz'  # NEW: Transportation insurance
-    ]
-    if any(keyword in name for keyword in transport_keywords):
-        return 'Transportation'
-
-    # Financial Services (removed CLEO AI and Insurance)
-    financial_keywords = [
-        'chime', 'paypal inc', 'one\*finance',
-        'affirm', 'afterpay', 'klarna', 'sezzle',
-        'paywithfour', 'zip*', 'tulu'
-    ]
-    if any(keyword in name for keyword in financial_keywords):
-        return 'Financial Services'
-
-    # Phone / Utilities
-    phone_keywords = [
-        'at&t', 'verizon', 't-mobile', 'sprint', 'us mobile', 'vesta',
-        'prepaid', 'mobile phone', 'internet', 'wifi', 'electric',
-        'gas', 'water', 'utility', 'godaddy'
-    ]
-    if any(keyword in name for keyword in phone_keywords):
-        return 'Phone/Utilities'
-
-    # Tech & Subs (clean - no Apple Cash)
-    tech_keywords = [
-        'apple services', 'apple.com/bill', 'apple store', 'apple com bill',
-        'google', 'microsoft', 'netflix', 'spotify', 'amazon prime',
-        'hulu', 'disney', 'adobe', 'dropbox', 'icloud', 'github',
-        'patreon', 'twitch', 'youtube', 'soundcloud', 'audible',
-        'nektony', 'spokeo', 'truthfinder', 'epoch'
-    ]
-    if 'apple cash' not in name and any(keyword in name for keyword in tech_keywords):
-        return 'Tech & Subs'
-
-    # Grocery / Delis
-    grocery_keywords = [
-        'grocery', 'market', 'supermarket', 'trader joe', 'whole foods',
-        'target', 'walmart', 'costco', 'cvs', 'walgreens', 'duane reade',
-        'rite aid', 'food town', 'key food', 'fairway', 'shoprite',
-        'stop & shop', 'kroger', 'safeway', 'albertsons', 'wawa'
-    ]
-    deli_keywords = ['deli', 'bodega', '7-eleven', 'convenience', 'smoke shop']
-
-    if any(keyword in name for keyword in grocery_keywords):
-        return 'Grocery/Daily'
-    if any(keyword in name for keyword in deli_keywords) or re.search(r'deli|bodega', name):
-        return 'Grocery/Daily'
-
-    # Fast Food
-    fastfood_keywords = [
-        'mcdonald', 'burger king', 'wendy', 'taco bell', 'kfc',
-        'subway', 'chick-fil-a', 'chick fil a', 'popeyes', 'five guys',
-        'shake shack', 'chipotle', 'panda express'
-    ]
-    if any(keyword in name for keyword in fastfood_keywords):
-        return 'Fast Food'
-
-    # Restaurants / Dining
-    restaurant_patterns = [
-        r'^tst\*', r'^sq \*',
-        r'restaurant', r'cafe', r'pizza', r'sushi', r'grill',
-        r'bistro', r'kitchen', r'eatery'
-    ]
-    restaurant_keywords = [
-        'mama pho', 'pho', 'falafel', 'yia yias', 'wonder',
-        'dining', 'noodle', 'ramen'
-    ]
-    if any(re.search(pattern, name) for pattern in restaurant_patterns):
-        return 'Dining/Restaurants'
-    if any(keyword in name for keyword in restaurant_keywords):
-        return 'Dining/Restaurants'
-
-    # Food Delivery
-    delivery_keywords = [
-        'doordash', 'ubereats', 'uber eats', 'grubhub', 'seamless',
-        'postmates', 'instacart', 'caviar', 'gopuff'
-    ]
-    if any(keyword in name for keyword in delivery_keywords):
-        return 'Delivery'
-
-    # Services
-    service_keywords = [
-        'laundry', 'dry clean', 'salon', 'barber', 'gym', 'fitness',
-        'fedex', 'ups', 'usps', 'shipping', 'hercules corp'
-    ]
-    if any(keyword in name for keyword in service_keywords):
-        return 'Services/Laundry'
-
-    # Entertainment
-    entertainment_keywords = [
-        'movie', 'cinema', 'theater', 'concert', 'tickets',
-        'amc', 'regal', 'ticketmaster'
-    ]
-    if any(keyword in name for keyword in entertainment_keywords):
-        return 'Entertainment'
-
-    # Retail / Shopping
-    retail_keywords = [
-        'kohl', 'macy', 'nordstrom', 'h&m', 'zara', 'gap',
-        'tj maxx', 'marshall', 'ross', 'burlington', 'nike'
-    ]
-    if any(keyword in name for keyword in retail_keywords):
-        return 'Retail/Shopping'
-
-    # ATM
-    if 'atm' in name or 'pai atm' in name or 'pai iso' in name:
-        return 'ATM/Cash'
-
-    # Vending
-    if 'vending' in name or 'canteen' in name:
-        return 'Vending/Snacks'
-
-    # Healthcare
-    health_keywords = [
-        'pharmacy', 'medical', 'doctor', 'dentist', 'health'
-    ]
-    if any(keyword in name for keyword in health_keywords):
-        return 'Healthcare'
-
-    # Home / Hardware
-    home_keywords = [
-        'home depot', 'lowe', 'hardware', 'ikea'
-    ]
-    if any(keyword in name for keyword in home_keywords):
-        return 'Home/Hardware'
-
-    return 'Other/Uncategorized'
+    return CATEGORY_MATCHER.match(name)
+
+
+def normalized_names(df):
+    """Lowercased merchant names with missing values as empty strings."""
+    return df['Name'].fillna('').astype(str).str.lower()
+
+
+def detect_transfers(df, cache=None):
+    """Vectorized is_transfer over the whole frame."""
+    return pd.Series(TRANSFER_MATCHER.match_indices(normalized_names(df), cache=cache) >= 0, index=df.index)
+
+
+def categorize_transactions(df, cache=None):
+    """Vectorized categorize_transaction over the whole frame."""
+    categories = CATEGORY_MATCHER.match_labels(normalized_names(df), cache=cache)
+    excluded = (df['Analysis_Status'] == 'Excluded').to_numpy()
+    return pd.Series(np.where(excluded, 'Excluded', categories), index=df.index)
+
+
+def spend_cents(df):
+    """True spend per row in integer cents: refund-netted amounts when the audit has them."""
+    net_col = NET_AMOUNT_COLUMN + CENTS_SUFFIX
+    return df[net_col] if net_col in df.columns else df['Amount' + CENTS_SUFFIX]
+
+
+def audit_dates(df):
+    """Parsed transaction dates (Date_parsed, or Date itself in a compact frame)."""
+    return df['Date_parsed'] if 'Date_parsed' in df.columns else df['Date']
+
+
+def output_frame(df):
+    """
+    The audit as written to disk: dollar amounts, and for compact frames a
+    formatted Date and the derived date columns.
+    """
+    df = expand_frame(df)
+    if 'Date_parsed' in df.columns:
+        return df
+    dates = df['Date']
+    df['Date'] = dates.dt.strftime(DATE_FORMAT)
+    df['Date_parsed'] = dates
+    df['Month'] = dates.dt.to_period('M')
+    df['MonthName'] = dates.dt.strftime('%B')
+    df['MonthNum'] = dates.dt.month
+    return df
+
+
+def transaction_fingerprints(df):
+    """
+    Stable 64-bit fingerprint per source row: a hash of the row content plus
+    its occurrence number, so two identical charges on the same day remain
+    two distinct transactions. (The complete audit carries no transaction
+    IDs to key on.)
+    """
+    # Hash rows in their on-disk form (dollars, formatted dates) so fingerprints match either mode
+    columns = [col for col in FINGERPRINT_COLUMNS if col in df.columns or col + CENTS_SUFFIX in df.columns]
+    df = expand_frame(df[[col + CENTS_SUFFIX if col + CENTS_SUFFIX in df.columns else col for col in columns]])
+    if pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = df['Date'].dt.strftime(DATE_FORMAT)
+    content = pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy()
+    occurrence = pd.Series(content).groupby(content).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({'content': content, 'occurrence': occurrence}), index=False
+    ).to_numpy()
+
+
+def ruleset_key():
+    """Identifies the rules the watermark was built with; a change forces a full rebuild."""
+    return f"{TRANSFER_MATCHER.fingerprint}:{CATEGORY_MATCHER.fingerprint}"
+
+
+def watermark_path(output_file):
+    """Watermark file kept next to the audit it describes."""
+    return os.path.splitext(output_file)[0] + WATERMARK_SUFFIX
+
+
+def load_watermark(path):
+    """Fingerprints of the audit rows, or None if absent, of an older layout or built with other rules."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as state:
+        if 'version' not in state or int(state['version']) != WATERMARK_VERSION:
+            return None
+        if str(state['rules']) != ruleset_key():
+            return None
+        return state['fingerprints']
+
+
+def save_watermark(fingerprints, path):
+    """Persist the audit rows' fingerprints (in row order) alongside the ruleset they were categorized with."""
+    np.savez(path, fingerprints=fingerprints, rules=np.array(ruleset_key()), version=np.array(WATERMARK_VERSION))
+
+
+def load_window(path, start, end, compact=False):
+    """
+    Audit rows dated in months ``start``..``end`` with amounts in cents and a
+    parsed Date_parsed column, or as a compact_frame with Date itself parsed
+    when ``compact``.
+    Partitioned audits read only those months; flat files are loaded in
+    full and filtered.
+    """
+    if is_partitioned(path):
+        df = read_partitioned(path, start, end)
+    else:
+        df = read_dataset(path)
+    dates = pd.to_datetime(df['Date'], format=DATE_FORMAT, errors='coerce')
+    if compact:
+        df['Date'] = dates
+        df = compact_frame(df)
+    else:
+        # Columnar storage returns labels as categoricals; the audit rewrites them
+        df = df.astype({col: object for col in df.select_dtypes('category').columns})
+        df['Date_parsed'] = dates
+        df = to_cents_columns(df)
+
+    months = dates.dt.to_period('M')
+    in_window = months.notna()
+    if start is not None:
+        in_window &= months >= pd.Period(start, 'M')
+    if end is not None:
+        in_window &= months <= pd.Period(end, 'M')
+    return df[in_window.to_numpy()]
+
+
+def covered_months(dates, start, end):
+    """
+    Months spanned by the window: its bounds where given, otherwise the
+    first / last month with data. Returns a PeriodIndex (empty without data).
+    """
+    if dates.notna().sum() == 0 and (start is None or end is None):
+        return pd.PeriodIndex([], freq='M')
+    first = pd.Period(start, 'M') if start is not None else dates.min().to_period('M')
+    last = pd.Period(end, 'M') if end is not None else dates.max().to_period('M')
+    return pd.period_range(first, last, freq='M')
+
+
+def period_label(months):
+    """Human-readable label for a run of months, e.g. 'July-Dec 2025'."""
+    if len(months) == 0:
+        return 'no data'
+    first, last = months[0], months[-1]
+    if first == last:
+        return first.strftime('%B %Y')
+    if first.year == last.year:
+        return f"{first.strftime('%B')}-{last.strftime('%b %Y')}"
+    return f"{first.strftime('%b %Y')}-{last.strftime('%b %Y')}"
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build the July-December 2025 audit (or another period).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only process rows not yet in the output audit and append them (rows changed "
+                             "upstream are replaced)")
+    parser.add_argument('--input', default=INPUT_FILE,
+                        help=f"Complete audit to filter (.csv, .parquet, .feather or a month-partitioned "
+                             f"directory; default: {INPUT_FILE})")
+    parser.add_argument('--start', default=DEFAULT_START,
+                        help="First month of the window, YYYY-MM (default: %(default)s)")
+    parser.add_argument('--end', default=DEFAULT_END,
+                        help="Last month of the window, YYYY-MM (default: latest month in the audit)")
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help=f"Audit to write; the extension follows --format (default: {OUTPUT_FILE})")
+    parser.add_argument('--compact', action='store_true',
+                        help="Hold the audit in compact form (categorical labels, one date column)")
+    add_report_arguments(parser)
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                        help="Output storage format (columnar formats need pyarrow; default: csv)")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    report = start_report('create_july_dec_audit', args)
+
+    # Load only the selected window (partitioned audits skip other months on disk)
+    with report.stage('load') as stage:
+        df = load_window(args.input, args.start, args.end, compact=args.compact)
+        stage.rows_out = len(df)
+    months = covered_months(audit_dates(df), args.start, args.end)
+    period = period_label(months)
+
     print("="*60)
-    print("FINAL AUDIT - JULY TO DECEMBER 2025")
+    print(f"FINAL AUDIT - {period.upper()}")
     print("Updated: CLEO AI → Transportation, Insurance → Transportation")
     print("="*60)
 
-    # Load the complete audit
-    df = pd.read_csv('Complete_Audit_PayPal_CashApp.csv')
-
-    # Parse dates
-    df['Date_parsed'] = pd.to_datetime(df['Date'], format='%m/%d/%Y', errors='coerce')
-
-    # Filter to July-Dec 2025 FIRST for efficiency
-    june_2025_end = pd.Timestamp('2025-06-30')
-    df = df[df['Date_parsed'] > june_2025_end].copy()
-
-    print(f"\nFiltered to July-Dec 2025: {len(df)} transactions")
+    print(f"\nFiltered to {period}: {len(df)} transactions")
+
+    # Skip rows that an earlier run already normalized, excluded and categorized;
+    # audit rows whose source row changed or left the window are dropped
+    with report.stage('fingerprint', rows_in=len(df)) as stage:
+        fingerprints = transaction_fingerprints(df)
+        output_file = with_extension(args.output, args.format)
+        processed = (load_watermark(watermark_path(output_file))
+                     if args.incremental and os.path.exists(output_file) else None)
+        if args.incremental and processed is None:
+            print("No usable watermark (first run or rules changed) - rebuilding in full")
+        kept = None
+        if processed is not None:
+            is_stale = ~np.isin(processed, fingerprints)
+            if is_stale.any():
+                kept = read_dataset(output_file)
+                if len(kept) != len(processed):
+                    print("Watermark does not match the audit - rebuilding in full")
+                    processed = kept = None
+                else:
+                    kept = kept[~is_stale]
+        if processed is not None:
+            is_new = ~np.isin(fingerprints, processed)
+            df = df[is_new]
+            print(f"Incremental: {len(df)} new transactions ({int((~is_new).sum())} already processed)")
+            if kept is not None:
+                print(f"  {int(is_stale.sum())} audit rows changed upstream or left the window - replacing them")
+        stage.rows_out = len(df)
+    if processed is not None and kept is None and len(df) == 0:
+        print(f"\n✓ {output_file} is up to date")
+        finish_report(report, args)
+        return df, df
+
+    # Merchant classifications are memoized on disk per ruleset
+    transfer_cache = CategorizationCache(TRANSFER_MATCHER)
+    category_cache = CategorizationCache(CATEGORY_MATCHER)
 
     # Identify and exclude transfers
-    transfer_mask = df.apply(is_transfer, axis=1) & (df['Analysis_Status'] == 'Included (True Spend)')
-    transfer_count = transfer_mask.sum()
+    with report.stage('detect_transfers', rows_in=len(df)) as stage:
+        transfer_mask = detect_transfers(df, cache=transfer_cache) & (df['Analysis_Status'] == 'Included (True Spend)')
+        transfer_count = transfer_mask.sum()
+        stage.rows_out = len(df)
 
     if transfer_count > 0:
         print(f"Excluding {transfer_count} transfers")
-        df.loc[transfer_mask, 'Analysis_Status'] = 'Excluded'
-        df.loc[transfer_mask, 'Exclusion_Reason'] = 'Transfer / Noise'
-        df.loc[transfer_mask, 'Category'] = 'Excluded'
+        assign_label(df, transfer_mask, 'Analysis_Status', 'Excluded')
+        assign_label(df, transfer_mask, 'Exclusion_Reason', 'Transfer / Noise')
+        assign_label(df, transfer_mask, 'Category', 'Excluded')
 
     # Apply updated categorization
     print("Applying updated categorization...")
-    df['Category'] = df.apply(categorize_transaction, axis=1)
-
-    # Add month column for analysis
-    df['Month'] = df['Date_parsed'].dt.to_period('M')
-    df['MonthName'] = df['Date_parsed'].dt.strftime('%B')
-    df['MonthNum'] = df['Date_parsed'].dt.month
+    with report.stage('categorize_transactions', rows_in=len(df)) as stage:
+        df['Category'] = categorize_transactions(df, cache=category_cache)
+        if args.compact:
+            df['Category'] = df['Category'].astype('category')
+        stage.rows_out = len(df)
+    print(f"  Classified {category_cache.misses} new merchant names ({category_cache.hits} cached)")
+    transfer_cache.save()
+    category_cache.save()
+
+    # Add month column for analysis (compact frames derive it when written)
+    if not args.compact:
+        df['Month'] = df['Date_parsed'].dt.to_period('M')
+        df['MonthName'] = df['Date_parsed'].dt.strftime('%B')
+        df['MonthNum'] = df['Date_parsed'].dt.month
 
     # Final statistics
     print("\n" + "="*60)
-    print("FINAL AUDIT STATISTICS (JULY-DEC 2025)")
+    print("NEW TRANSACTION STATISTICS" if processed is not None else f"FINAL AUDIT STATISTICS ({period.upper()})")
     print("="*60)
 
-    included = df[df['Analysis_Status'] == 'Included (True Spend)']
-    excluded = df[df['Analysis_Status'] == 'Excluded']
-
-    print(f"\nTotal transactions: {len(df)}")
-    print(f"Included (True Spend): {len(included)}")
-    print(f"Excluded: {len(excluded)}")
-
-    true_spend = included['Amount'].sum()
-    print(f"\n💰 Total True Spend (July-Dec 2025): ${true_spend:,.2f}")
-    print(f"📊 Monthly Average: ${true_spend/6:,.2f}")
-
-    # Category breakdown
-    print(f"\nCategory Breakdown:")
-    category_counts = included['Category'].value_counts()
-    print(category_counts)
-
-    # Save final audit
-    output_file = 'July_December_2025_Audit.csv'
-    df.to_csv(output_file, index=False)
-    print(f"\n✓ Final audit saved to: {output_file}")
+    with report.stage('aggregate', rows_in=len(df), detail='totals') as stage:
+        included = df[(df['Analysis_Status'] == 'Included (True Spend)').to_numpy()]
+        spend = spend_cents(included)
+
+        print(f"\nTotal transactions: {len(df)}")
+        print(f"Included (True Spend): {len(included)}")
+        print(f"Excluded: {int((df['Analysis_Status'] == 'Excluded').sum())}")
+
+        true_spend = spend.sum() / 100
+        print(f"\n💰 Total True Spend ({period}): ${true_spend:,.2f}")
+        if len(months) > 0:
+            plural = 's' if len(months) != 1 else ''
+            print(f"📊 Monthly Average: ${true_spend/len(months):,.2f} over {len(months)} month{plural}")
+
+        # Category breakdown
+        print(f"\nCategory Breakdown:")
+        category_counts = label_counts(included['Category'])
+        print(category_counts)
+        stage.rows_out = len(category_counts)
+
+    # Save final audit (incremental runs append in the existing column order)
+    with report.stage('write', rows_in=len(df)) as stage:
+        if kept is not None:
+            write_dataset(kept, output_file)
+            append_dataset(output_frame(df), output_file)
+            save_watermark(np.concatenate([processed[~is_stale], fingerprints[is_new]]), watermark_path(output_file))
+            print(f"\n✓ Dropped {int(is_stale.sum())} stale and added {len(df)} transactions in: {output_file}")
+        elif processed is not None:
+            append_dataset(output_frame(df), output_file)
+            save_watermark(np.concatenate([processed, fingerprints[is_new]]), watermark_path(output_file))
+            print(f"\n✓ Appended {len(df)} transactions to: {output_file}")
+        else:
+            write_dataset(output_frame(df), output_file)
+            save_watermark(fingerprints, watermark_path(output_file))
+            print(f"\n✓ Final audit saved to: {output_file}")
+        stage.rows_out = len(df)
 
     # Category summary with amounts
     print("\n" + "="*60)
     print("SPENDING BY CATEGORY")
     print("="*60)
 
-    category_summary = []
-    for category in sorted(category_counts.index):
-        if category != 'Other/Uncategorized':
-            count = category_counts[category]
-            amount = included[included['Category'] == category]['Amount'].sum()
-            avg = amount / count if count > 0 else 0
-            pct = (abs(amount) / abs(true_spend) * 100) if true_spend != 0 else 0
-
-            category_summary.append({
-                'Category': category,
-                'Transactions': count,
-                'Total': amount,
-                'Average': avg,
-                'Percent': pct
-            })
-
-            print(f"\n{category}")
-            print(f"  Transactions: {count}")
-            print(f"  Total: ${amount:,.2f}")
-            print(f"  Average: ${avg:,.2f}")
-            print(f"  Percent of spend: {pct:.1f}%")
-
-    # Monthly breakdown
-    print("\n" + "="*60)
-    print("MONTHLY SPENDING BREAKDOWN")
-    print("="*60)
-
-    monthly = included.groupby('Month')['Amount'].sum().sort_index()
-    for month, amount in monthly.items():
-        print(f"{month}: ${amount:,.2f}")
+    with report.stage('aggregate', rows_in=len(included), detail='by category and month') as stage:
+        category_totals = spend.groupby(included['Category'], observed=True).sum()
+        category_summary = []
+        for category in sorted(category_counts.index):
+            if category != 'Other/Uncategorized':
+                count = category_counts[category]
+                amount = category_totals[category] / 100
+                avg = amount / count if count > 0 else 0
+                pct = (abs(amount) / abs(true_spend) * 100) if true_spend != 0 else 0
+
+                category_summary.append({
+                    'Category': category,
+                    'Transactions': count,
+                    'Total': amount,
+                    'Average': avg,
+                    'Percent': pct
+                })
+
+                print(f"\n{category}")
+                print(f"  Transactions: {count}")
+                print(f"  Total: ${amount:,.2f}")
+                print(f"  Average: ${avg:,.2f}")
+                print(f"  Percent of spend: {pct:.1f}%")
+
+        # Monthly breakdown
+        print("\n" + "="*60)
+        print("MONTHLY SPENDING BREAKDOWN")
+        print("="*60)
+
+        monthly = spend.groupby(audit_dates(included).dt.to_period('M')).sum().sort_index()
+        for month, amount in monthly.items():
+            print(f"{month}: ${amount / 100:,.2f}")
+        stage.rows_out = len(category_summary) + len(monthly)
 
     print("\n✓ Data ready for visualization!")
 
+    finish_report(report, args)
+
     return df, included
 
 
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Dashboard Spending Cube
+
+Pre-aggregates dashboard rows so the dashboard can draw its summary charts
+without touching row-level data. Rows are mapped to the dashboard's display
+groups (a port of categoryRemap() in unified-dashboard-ultimate.html;
+tests/test_dashboard_cube.py runs both on the same inputs) and rolled up
+per month, flow (out/in), group, category and merchant into sums, counts
+and min/max, plus a Pareto ranking of merchants by spend and the spend
+Sankey graph (total -> group -> category) with its node layout.
+
+The cube is written as dictionary-encoded JSON: dimension values are stored
+once in lookup lists and cells refer to them by index.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+CUBE_VERSION = 2
+
+EXCLUDED_GROUPS = ['Cash Management', 'P2P Transfers', 'ATM/Cash']
+EXCLUDED_CATEGORIES = ['Cash App Balance', 'Debit Transfer', 'P2P Transfer', 'Chime', 'ATM Withdrawal', 'Money Transfer']
+
+# Keyword fallbacks for Other/Unknown rows, in categoryRemap() order
+DESCRIPTION_RULES = [
+    (('Subscriptions', 'Software'), lambda d: 'apple' in d and ('bill' in d or 'service' in d)),
+    (('Subscriptions', 'Media'), lambda d: any(k in d for k in ('spotify', 'netflix', 'hulu', 'disney', 'hbo', 'prime video'))),
+    (('Subscriptions', 'Software'), lambda d: any(k in d for k in ('openai', 'chatgpt', 'deepl', 'browsertrix', 'google', 'microsoft'))),
+    (('Financial Services', 'BNPL'), lambda d: any(k in d for k in ('paywithfour', 'afterpay', 'klarna', 'affirm', 'quadpay'))),
+    (('Subscriptions', 'Background Check'), lambda d: any(k in d for k in ('beenverified', 'spokeo', 'truthfinder'))),
+    (('Dining & Cafes', 'Dining Out'), lambda d: any(k in d for k in ('deli', 'nostrand', 'pizza', 'halal', 'restaurant', 'cafe'))),
+    (('Dining & Cafes', 'Delivery'), lambda d: any(k in d for k in ('wonder', 'doordash', 'uber eats', 'grubhub', 'seamless'))),
+    (('Groceries', 'Supermarket'), lambda d: any(k in d for k in ('market', 'grocery', 'target'))),
+    (('Transportation', 'Public Transit'), lambda d: any(k in d for k in ('omny', 'mta', 'subway', 'transit'))),
+    (('Transportation', 'Rideshare'), lambda d: any(k in d for k in ('uber', 'lyft', 'taxi'))),
+    (('Transportation', 'Bike Share'), lambda d: any(k in d for k in ('citibike', 'bike'))),
+    (('Bills & Utilities', 'Laundry'), lambda d: any(k in d for k in ('hercules', 'laundry'))),
+    (('Bills & Utilities', 'Phone'), lambda d: any(k in d for k in ('us mobile', 'phone', 'mobile'))),
+    (('Services', 'Shipping'), lambda d: any(k in d for k in ('usps', 'fedex', 'ups', 'shipping'))),
+    (('Financial Services', 'Fees'), lambda d: 'paypal' in d and 'fee' in d),
+    (('Health & Wellness', 'Pharmacy'), lambda d: any(k in d for k in ('walgreens', 'cvs', 'pharmacy'))),
+    (('Retail & Shopping', 'General'), lambda d: any(k in d for k in ('marshalls', 'tj maxx', 'target', 'amazon', 'walmart'))),
+    (('Retail & Shopping', 'Electronics'), lambda d: any(k in d for k in ('best buy', 'apple store', 'electronics'))),
+]
+
+FALLBACK = ('Subscriptions', 'Other Services')
+
+# Sankey: flows below these shares of total spend are not drawn
+SANKEY_MIN_GROUP_SHARE = 0.01
+SANKEY_MIN_CATEGORY_SHARE = 0.005
+
+# Sankey chart geometry from renderSankey(): fixed height, margin, node padding
+SANKEY_HEIGHT = 900
+SANKEY_MARGIN = 40
+SANKEY_NODE_WIDTH = 40
+SANKEY_NODE_PADDING = 30
+
+# Cube dimension -> payload key of its lookup list
+CUBE_DIMENSIONS = {'Month': 'months', 'Flow': 'flows', 'Group': 'groups', 'Category': 'categories', 'Merchant': 'merchants'}
+
+
+def display_category(group, category, description):
+    """Dashboard (group, category) for a row, or None if the dashboard hides it."""
+    g = (group or '').strip()
+    s = (category or '').strip()
+    desc = (description or '').lower()
+
+    if g in EXCLUDED_GROUPS or s in EXCLUDED_CATEGORIES:
+        return None
+    if g.startswith('$') or s.startswith('$') or 'cash app' in desc:
+        return None
+
+    if g in ('Groceries', 'Dining Out', 'DoorDash'):
+        if s in ('Deli/Market', 'Supermarket', 'Convenience Store'):
+            return ('Groceries', 'Supermarket')
+        if s in ('Restaurant', 'Fast Food'):
+            return ('Dining & Cafes', 'Restaurants')
+        if s == 'Coffee':
+            return ('Dining & Cafes', 'Coffee')
+        if g == 'DoorDash':
+            return ('Dining & Cafes', 'Delivery')
+        return ('Dining & Cafes', 'Dining Out')
+
+    if g == 'Food Delivery':
+        return ('Dining & Cafes', 'Delivery')
+
+    if g in ('Transportation', 'Rideshare - Uber', 'Car Rental'):
+        if s in ('Rideshare - Uber', 'Rideshare - Lyft', 'Rideshare - Taxi') or g == 'Rideshare - Uber':
+            return ('Transportation', 'Rideshare')
+        if s in ('Transit - Subway/Bus', 'Bike Share'):
+            return ('Transportation', 'Public Transit')
+        if s in ('Gas Station', 'EV Charging'):
+            if 'us mobile' in desc:
+                return ('Bills & Utilities', 'Phone')
+            return ('Transportation', 'Fuel')
+        if s in ('Car Rental', 'Parking') or g == 'Car Rental':
+            return ('Transportation', 'Parking')
+        return ('Transportation', 'Rideshare')
+
+    if g == 'Shopping':
+        if s == 'Clothing':
+            return ('Retail & Shopping', 'Clothing')
+        if s == 'Electronics':
+            return ('Retail & Shopping', 'Electronics')
+        return ('Retail & Shopping', 'General')
+    if g == 'Tobacco/Vape':
+        return ('Retail & Shopping', 'Tobacco')
+    if g == 'Shipping':
+        return ('Services', 'Shipping')
+
+    if g in ('Bills & Housing', 'Subscriptions', 'Software'):
+        if s in ('Phone/Internet', 'Mobile Top-up'):
+            return ('Bills & Utilities', 'Phone')
+        if s == 'Insurance':
+            return ('Bills & Utilities', 'Insurance')
+        if s in ('Rent', 'Moving'):
+            return ('Bills & Utilities', 'Rent')
+        if s in ('Apple Services', 'Software') or g == 'Software':
+            return ('Subscriptions', 'Software')
+        return ('Subscriptions', 'Media')
+
+    if g in ('Health', 'Personal Care'):
+        if s == 'Pharmacy':
+            return ('Health & Wellness', 'Pharmacy')
+        return ('Health & Wellness', 'Medical')
+
+    if g in ('Travel', 'Entertainment'):
+        if s == 'Hotels':
+            return ('Travel', 'Lodging')
+        return ('Entertainment', 'General')
+
+    if g == 'Services':
+        if s == 'PayPal Fees':
+            return ('Financial Services', 'Fees')
+        if s == 'Shipping':
+            return ('Services', 'Shipping')
+        if s == 'Mobile Top-up':
+            return ('Bills & Utilities', 'Phone')
+        return ('Services', 'Professional')
+
+    if g in ('Other', 'Unknown', ''):
+        for label, rule in DESCRIPTION_RULES:
+            if rule(desc):
+                return label
+
+    return FALLBACK
+
+
+def _text(series):
+    return series.fillna('').astype(str)
+
+
+def dashboard_rows(df):
+    """
+    Dashboard rows as processRows() sees them.
+
+    Returns a frame with Date (datetime), Merchant, Amount (absolute
+    dollars), Flow ('out'/'in'), Group and Category in display terms; rows
+    the dashboard hides are dropped.
+    """
+    # Empty amounts count as 0 like processRows(); unparseable ones are dropped
+    raw = _text(df['Amount']).str.replace(r'[^0-9.-]', '', regex=True)
+    amount = pd.to_numeric(raw.mask(raw == '', '0'), errors='coerce')
+    group, category = _text(df['Group']), _text(df['Category'])
+
+    # Positive amounts are spend unless the row is labelled as income
+    lowered_group, lowered_category = group.str.lower(), category.str.lower()
+    is_income = (lowered_group.str.contains('income', regex=False) | lowered_category.str.contains('income', regex=False)
+                 | lowered_category.str.contains('deposit', regex=False))
+    flow = np.where((amount > 0) & is_income, 'in', 'out')
+
+    merchant = _text(df['Description']).str.replace(r' nan$', '', case=False, regex=True).str.strip()
+    merchant = merchant.mask(merchant == '', 'Unknown')
+
+    # categoryRemap() per distinct (group, category, description)
+    keys = pd.MultiIndex.from_arrays([group, category, merchant])
+    codes, uniques = pd.factorize(keys)
+    remapped = [display_category(g, c, m) for g, c, m in uniques]
+    visible = np.array([label is not None for label in remapped], dtype=bool)
+    display_groups = np.array([label[0] if label else '' for label in remapped], dtype=object)
+    display_categories = np.array([label[1] if label else '' for label in remapped], dtype=object)
+
+    rows = pd.DataFrame({
+        'Date': pd.to_datetime(df['Date'], format='mixed', errors='coerce'),
+        'Merchant': merchant,
+        'Amount': amount.abs(),
+        'Flow': flow,
+        'Group': display_groups[codes],
+        'Category': display_categories[codes],
+    }, index=df.index)
+    keep = visible[codes] & amount.notna().to_numpy() & rows['Date'].notna().to_numpy()
+    return rows[keep]
+
+
+def build_cube(rows):
+    """Sums, counts and min/max per month, flow, group, category and merchant."""
+    rows = rows.assign(Month=rows['Date'].dt.strftime('%Y-%m'))
+    return (rows.groupby(list(CUBE_DIMENSIONS), sort=True, observed=True)['Amount']
+            .agg(Total='sum', Count='count', Min='min', Max='max')
+            .reset_index())
+
+
+def pareto(cube):
+    """Merchants ranked by spend with their cumulative share of total spend (%)."""
+    spend = cube[cube['Flow'] == 'out'].groupby('Merchant')['Total'].sum()
+    spend = spend.sort_values(ascending=False, kind='stable')
+    total = spend.sum()
+    cumulative = spend.cumsum() / total * 100 if total else spend * 0
+    return pd.DataFrame({'Merchant': spend.index, 'Total': spend.to_numpy(), 'Cumulative_Pct': cumulative.to_numpy()})
+
+
+def sankey_graph(cube):
+    """
+    Spend flow graph: total -> group -> category.
+
+    Returns (nodes, links) frames. Nodes have Name, Depth (0 total, 1 group,
+    2 category), Group and Value; links have Source, Target (node
+    positions) and Value. Groups under SANKEY_MIN_GROUP_SHARE and categories
+    under SANKEY_MIN_CATEGORY_SHARE of total spend are left out, and a
+    group's value is the sum of the categories drawn under it.
+    """
+    spend = cube[cube['Flow'] == 'out']
+    total = spend['Total'].sum()
+    groups = spend.groupby('Group')['Total'].sum()
+    categories = spend.groupby(['Group', 'Category'])['Total'].sum().reset_index()
+
+    shown = groups.index[groups >= total * SANKEY_MIN_GROUP_SHARE]
+    categories = categories[categories['Group'].isin(shown)
+                            & (categories['Total'] >= total * SANKEY_MIN_CATEGORY_SHARE)]
+    group_values = categories.groupby('Group')['Total'].sum()
+    group_values = group_values.sort_values(ascending=False, kind='stable')
+
+    # Categories listed under their group, largest first, so links never cross
+    rank = pd.Series(np.arange(len(group_values)), index=group_values.index)
+    categories = categories.assign(Rank=categories['Group'].map(rank))
+    categories = categories.sort_values(['Rank', 'Total'], ascending=[True, False], kind='stable')
+
+    nodes = pd.DataFrame({
+        'Name': ['Total Outflow'] + group_values.index.tolist() + categories['Category'].tolist(),
+        'Depth': [0] + [1] * len(group_values) + [2] * len(categories),
+        'Group': [''] + group_values.index.tolist() + categories['Group'].tolist(),
+        'Value': [group_values.sum()] + group_values.tolist() + categories['Total'].tolist(),
+    })
+    group_node = pd.Series(np.arange(1, len(group_values) + 1), index=group_values.index)
+    links = pd.DataFrame({
+        'Source': np.concatenate([np.zeros(len(group_values), dtype=int),
+                                  categories['Group'].map(group_node).to_numpy(dtype=int)]),
+        'Target': np.arange(1, len(nodes)),
+        'Value': nodes['Value'].to_numpy()[1:],
+    })
+    return nodes, links
+
+
+def sankey_layout(nodes, links, height=SANKEY_HEIGHT, margin=SANKEY_MARGIN, padding=SANKEY_NODE_PADDING):
+    """
+    Vertical node and link positions (pixels) for the group/category columns.
+
+    Mirrors d3.sankey's scaling: one value-to-pixel factor fits the fullest
+    column into the chart height, columns keep their node order and shorter
+    columns are centred. Horizontal positions depend on the chart width and
+    are left to the browser. The total node (depth 0) is not laid out.
+    """
+    extent = height - 2 * margin
+    columns = [nodes.index[nodes['Depth'] == depth] for depth in (1, 2)]
+    busiest = max(len(column) for column in columns)
+    padding = min(padding, extent / max(busiest - 1, 1))
+    scale = min((extent - (len(column) - 1) * padding) / nodes.loc[column, 'Value'].sum()
+                for column in columns if len(column))
+
+    y0 = np.full(len(nodes), np.nan)
+    y1 = np.full(len(nodes), np.nan)
+    for column in columns:
+        heights = nodes.loc[column, 'Value'].to_numpy() * scale
+        used = heights.sum() + (len(column) - 1) * padding
+        tops = margin + (extent - used) / 2 + np.concatenate([[0], np.cumsum(heights + padding)[:-1]])
+        y0[column], y1[column] = tops, tops + heights
+
+    # Links leave their source in target order and fill their target (one link in per node)
+    drawn = links[links['Source'] > 0]
+    widths = drawn['Value'].to_numpy() * scale
+    offsets = pd.Series(widths).groupby(drawn['Source'].to_numpy()).cumsum().to_numpy() - widths
+    return {
+        'height': height,
+        'node_width': SANKEY_NODE_WIDTH,
+        'y0': np.round(y0, 2),
+        'y1': np.round(y1, 2),
+        'link_y0': np.round(y0[drawn['Source'].to_numpy()] + offsets + widths / 2, 2),
+        'link_y1': np.round(y0[drawn['Target'].to_numpy()] + widths / 2, 2),
+        'link_width': np.round(widths, 2),
+    }
+
+
+def _json_list(values):
+    """Float array as a JSON list, with null for NaN."""
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+def cube_payload(cube, ranking):
+    """JSON-ready, dictionary-encoded cube: dimension lookups plus columnar cells."""
+    payload = {'version': CUBE_VERSION, 'cells': {}}
+    for dim, lookup in CUBE_DIMENSIONS.items():
+        codes, uniques = pd.factorize(cube[dim], sort=True)
+        payload[lookup] = uniques.tolist()
+        payload['cells'][dim.lower()] = codes.tolist()
+    payload['cells']['total'] = cube['Total'].round(2).tolist()
+    payload['cells']['count'] = cube['Count'].astype(int).tolist()
+    payload['cells']['min'] = cube['Min'].round(2).tolist()
+    payload['cells']['max'] = cube['Max'].round(2).tolist()
+
+    merchant_index = {name: i for i, name in enumerate(payload['merchants'])}
+    payload['pareto'] = {
+        'merchant': [merchant_index[name] for name in ranking['Merchant']],
+        'total': ranking['Total'].round(2).tolist(),
+        'cumulative_pct': ranking['Cumulative_Pct'].round(3).tolist(),
+    }
+
+    nodes, links = sankey_graph(cube)
+    layout = sankey_layout(nodes, links)
+    payload['sankey'] = {
+        'nodes': {'name': nodes['Name'].tolist(), 'depth': nodes['Depth'].tolist(),
+                  'group': nodes['Group'].tolist(), 'value': nodes['Value'].round(2).tolist()},
+        'links': {'source': links['Source'].tolist(), 'target': links['Target'].tolist(),
+                  'value': links['Value'].round(2).tolist()},
+        'layout': {key: _json_list(value) if isinstance(value, np.ndarray) else value for key, value in layout.items()},
+    }
+    return payload
+
+
+def write_cube(df, path):
+    """Build the cube for dashboard rows ``df`` and write it to ``path`` as JSON."""
+    cube = build_cube(dashboard_rows(df))
+    payload = cube_payload(cube, pareto(cube))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    return payload
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Dashboard Embedded Payload
+
+Encodes dashboard rows for embedding in the generated dashboards as a
+columnar, dictionary-encoded payload instead of per-row JSON objects or CSV
+text. Group, Category and Description become integer codes into lookup
+lists, dates become day offsets from the first date and amounts become
+integer cents, so the browser rebuilds rows without parsing a string per
+row (see decodeColumns() in unified-dashboard-ultimate.html).
+
+Payloads are embedded as ``<script type="application/json">`` elements, so
+the page never parses them as script; the dashboard decodes them in a Web
+Worker. They can optionally be gzip-compressed and base64-encoded; the
+dashboard inflates them with the browser's DecompressionStream.
+
+Long histories can be split into one payload per month plus a small
+manifest, so the dashboard decodes (or fetches) only the months in view.
+"""
+
+import base64
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+
+from money import to_cents
+
+
+PAYLOAD_VERSION = 1
+
+# Months shown when a sharded dashboard opens
+DEFAULT_WINDOW_MONTHS = 6
+
+# Encoded dimension column -> payload key of its lookup list
+LOOKUP_COLUMNS = {'Group': 'groups', 'Category': 'categories', 'Description': 'descriptions'}
+
+
+def encode_rows(df):
+    """
+    Columnar payload for dashboard rows ``df`` (Date, Description, Amount,
+    Group, Category).
+
+    ``day`` is the offset in days from ``epoch`` (null for unparseable
+    dates) and ``cents`` the signed amount in cents (empty amounts are 0,
+    as the dashboard reads them).
+    """
+    dates = pd.to_datetime(df['Date'], format='mixed', errors='coerce').dt.normalize()
+    epoch = dates.min()
+    days = ((dates - epoch).dt.days if pd.notna(epoch) else pd.Series(np.nan, index=df.index))
+    cents = to_cents(df['Amount']).fillna(0).to_numpy(dtype='int64')
+
+    payload = {
+        'version': PAYLOAD_VERSION,
+        'rows': len(df),
+        'epoch': epoch.strftime('%Y-%m-%d') if pd.notna(epoch) else None,
+        'columns': {
+            'day': [None if pd.isna(d) else int(d) for d in days],
+            'cents': cents.tolist(),
+        },
+    }
+    for col, lookup in LOOKUP_COLUMNS.items():
+        codes, uniques = pd.factorize(df[col].fillna('').astype(str), sort=True)
+        payload[lookup] = uniques.tolist()
+        payload['columns'][col.lower()] = codes.tolist()
+    return payload
+
+
+def month_shards(df):
+    """Payload per month ('YYYY-MM'), oldest first; rows with unparseable dates are left out."""
+    months = pd.to_datetime(df['Date'], format='mixed', errors='coerce').dt.strftime('%Y-%m')
+    return {month: encode_rows(part) for month, part in df.groupby(months, sort=True)}
+
+
+def shard_manifest(shards, files=None, window=DEFAULT_WINDOW_MONTHS):
+    """
+    Manifest for ``month_shards`` output: months in order with their row
+    counts and the default window. ``files`` maps months to shard URLs
+    (relative to the page) when shards are served as separate files; without
+    it the dashboard reads each month from its embedded ``shard-YYYY-MM``
+    element.
+    """
+    return {
+        'version': PAYLOAD_VERSION,
+        'months': list(shards),
+        'rows': [payload['rows'] for payload in shards.values()],
+        'window': window,
+        'files': files,
+    }
+
+
+def embed_json(obj, compress=False):
+    """
+    JavaScript literal for ``obj``: compact JSON, or a gzip+base64 envelope
+    ``{"encoding": "gzip+base64", "data": ...}`` when ``compress`` is set.
+    """
+    text = json.dumps(obj, separators=(',', ':'))
+    if not compress:
+        # Keep a '</script>' inside a merchant name from closing the script tag
+        return text.replace('</', '<\\/')
+    data = base64.b64encode(gzip.compress(text.encode('utf-8'), mtime=0)).decode('ascii')
+    return json.dumps({'encoding': 'gzip+base64', 'data': data}, separators=(',', ':'))
+
+
+def json_script(element_id, obj, compress=False):
+    """``<script type="application/json">`` element holding embed_json(obj)."""
+    return f'<script type="application/json" id="{element_id}">{embed_json(obj, compress)}</script>\n'
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Transaction Deduplication Engine
+
+Removes duplicate rows from the combined audit with grouped transforms and
+boolean masks instead of Python loops over groups, so one pass costs
+O(n log n) (the sort) no matter how many (date, amount, name) groups exist.
+
+Rules run in order; each one sees only the rows earlier rules kept, and the
+engine reports how many rows every rule removed. When the frame carries a
+Link_Cluster column (see linking.py), authorizations are matched to their
+settlements through the export's reference IDs first; the date/amount/name
+heuristic only handles what the links do not cover.
+"""
+
+import pandas as pd
+
+from linking import FUNDING_TYPES
+from reconciliation import reconcile_exact
+
+
+# Columns identifying the same charge across rows
+CHARGE_KEYS = ['Date', 'Amount_Cents', 'Name']
+
+AUTHORIZATION_PATTERN = 'Authorization'
+SETTLEMENT_PATTERN = 'PreApproved|Bill'
+# "Account Hold for Open Authorization" / "Void of Authorization" mention
+# authorizations but are hold legs (hold_pairing.py) and voids, not the auth
+HOLD_PATTERN = 'Hold'
+VOID_PATTERN = 'Void of'
+
+# Linked-cluster labels from linking.link_transactions
+CLUSTER_COLUMN = 'Link_Cluster'
+ID_COLUMN = 'Transaction_ID'
+
+
+def exact_duplicates(df):
+    """Rows repeating an earlier row's date, amount, name and type."""
+    return df.duplicated(subset=CHARGE_KEYS + ['Type'], keep='first')
+
+
+def authorizations(df):
+    """Authorization rows (General Authorization, ReAuthorization); not hold legs or voids."""
+    types = df['Type']
+    return (types.str.contains(AUTHORIZATION_PATTERN, case=False, na=False)
+            & ~types.str.contains(HOLD_PATTERN, case=False, na=False)
+            & ~types.str.startswith(VOID_PATTERN, na=False))
+
+
+def settled(df, is_authorization, is_settlement, keys):
+    """
+    Authorizations paired one-to-one with a settlement sharing all ``keys``
+    (occurrence-key join, so two identical auths need two settlements).
+
+    Rows sharing a Transaction_ID are one authorization (its Pending and
+    Completed rows): it is paired once and all of its rows are removed.
+    """
+    ids = df[ID_COLUMN].where(df[ID_COLUMN].astype(str).str.strip() != '') if ID_COLUMN in df.columns else None
+    auths = is_authorization
+    if ids is not None:
+        auth_ids = ids.where(is_authorization)
+        auths = auths & (auth_ids.isna() | ~auth_ids.duplicated())
+    matched, _, _ = reconcile_exact(df[auths.to_numpy()], df[is_settlement.to_numpy()], keys, keys)
+    paired = pd.Series(df.index.isin(matched['left_index']), index=df.index)
+    if ids is not None:
+        paired |= is_authorization & ids.isin(ids[paired].dropna())
+    return paired
+
+
+def settled_authorizations(df):
+    """
+    Authorizations whose charge also has a settlement row.
+
+    Keeps the settlement (e.g. PreApproved Payment) and drops the
+    authorization (General Authorization) for the same date, amount and name.
+    Rows with a missing key are never paired, so they are never removed.
+    """
+    is_settlement = df['Type'].str.contains(SETTLEMENT_PATTERN, case=False, na=False)
+    return settled(df, authorizations(df), is_settlement, CHARGE_KEYS)
+
+
+def linked_authorizations(df):
+    """
+    Authorizations linked by reference ID to a settlement of the same amount.
+
+    A cluster's settlement is any outgoing row that is not itself an
+    authorization, a hold or a funding leg (e.g. the General PayPal Debit
+    Card Transaction that captured a General Authorization). Reference
+    chains can join unrelated charges, so each authorization needs its own
+    settlement of its amount in the cluster.
+    """
+    if CLUSTER_COLUMN not in df.columns:
+        return pd.Series(False, index=df.index)
+
+    mentions_authorization = df['Type'].str.contains(AUTHORIZATION_PATTERN, case=False, na=False)
+    is_hold = df['Type'].str.contains(HOLD_PATTERN, case=False, na=False)
+    is_settlement = ((df['Amount_Cents'].fillna(0) < 0) & ~mentions_authorization & ~is_hold
+                     & ~df['Type'].isin(FUNDING_TYPES))
+    return settled(df, authorizations(df), is_settlement, [CLUSTER_COLUMN, 'Amount_Cents'])
+
+
+# (report label, row mask function), applied in order
+DEDUP_RULES = [
+    ('Exact duplicates', exact_duplicates),
+    ('Authorizations linked to a settlement', linked_authorizations),
+    ('Authorizations with a settlement', settled_authorizations),
+]
+
+
+def deduplicate(df, rules=DEDUP_RULES, keep=None):
+    """
+    Apply dedup ``rules`` to a frame sorted by date, amount and name.
+
+    ``keep`` (a boolean Series on ``df``'s index) marks rows no rule may
+    remove, e.g. hold legs already paired with their own charge: two such
+    legs of the same amount on the same day are two legs, not a duplicate.
+
+    Returns (deduplicated frame, {rule label: rows removed}).
+    """
+    df = df.sort_values(CHARGE_KEYS)
+    keep = (keep.reindex(df.index, fill_value=False) if keep is not None
+            else pd.Series(False, index=df.index)).to_numpy(dtype=bool)
+    removed = {}
+    for label, rule in rules:
+        mask = rule(df).to_numpy(dtype=bool) & ~keep
+        removed[label] = int(mask.sum())
+        if mask.any():
+            df, keep = df[~mask], keep[~mask]
+    return df, removed
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Hold / Reversal Pairing
+
+PayPal guards each card charge with an "Account Hold for Open Authorization"
+and releases it with a "Reversal of General Account Hold", both stamped with
+the same time and amount as the charge they guard. These legs are balance
+bookkeeping, not spend.
+
+Each leg is paired with the underlying outgoing transaction of the same
+absolute amount within a time window, using the sorted as-of joins of
+reconciliation.reconcile_fuzzy, so pairing costs O(n log n).
+"""
+
+import numpy as np
+import pandas as pd
+
+from linking import FUNDING_TYPES
+from reconciliation import reconcile_fuzzy
+
+
+HOLD_PATTERN = 'Account Hold'
+REVERSAL_PATTERN = 'Reversal of'
+
+# Max distance between a hold leg and the charge it guards
+HOLD_WINDOW = pd.Timedelta(minutes=5)
+
+# Exclusion_Reason of paired legs
+PAIRED_REASON = 'Hold / Reversal (Paired)'
+
+
+def pair_holds(df, window=HOLD_WINDOW, time_col='Timestamp'):
+    """
+    Pair hold and reversal legs with their underlying charge.
+
+    Pairing is one-to-one per leg kind (one hold and one reversal per
+    charge) and never crosses sources. Returns a DataFrame indexed by the
+    leg's index label with the paired charge's label in ``Paired_With``
+    and the ``time_diff`` between them.
+    """
+    is_leg = df['Type'].str.contains(HOLD_PATTERN, case=False, na=False)
+    is_reversal = is_leg & df['Type'].str.startswith(REVERSAL_PATTERN, na=False)
+    is_charge = (df['Amount_Cents'].fillna(0) < 0) & ~is_leg & ~df['Type'].isin(FUNDING_TYPES)
+
+    keys = pd.DataFrame({'time': df[time_col], 'amount': df['Amount_Cents'].abs()}, index=df.index)
+    sources = df['Source'] if 'Source' in df.columns else pd.Series('', index=df.index)
+
+    pairs = []
+    for source in sources.dropna().unique():
+        in_source = (sources == source).to_numpy()
+        charges = keys[in_source & is_charge.to_numpy()]
+        for legs in (keys[in_source & (is_leg & ~is_reversal).to_numpy()], keys[in_source & is_reversal.to_numpy()]):
+            if legs.empty or charges.empty:
+                continue
+            matched, _, _ = reconcile_fuzzy(legs, charges, ['time', 'amount'], ['time', 'amount'],
+                                            date_tolerance=window, amount_tolerance=0)
+            pairs.append(matched)
+
+    if not pairs:
+        return pd.DataFrame({'Paired_With': pd.Series(dtype=df.index.dtype),
+                             'time_diff': pd.Series(dtype='timedelta64[ns]')})
+    pairs = pd.concat(pairs, ignore_index=True)
+    return pd.DataFrame({'Paired_With': pairs['right_index'].to_numpy(),
+                         'time_diff': pairs['date_diff'].to_numpy()},
+                        index=pd.Index(pairs['left_index'].to_numpy(), name=df.index.name))
+
+
+def paired_hold_legs(df, window=HOLD_WINDOW, time_col='Timestamp'):
+    """Boolean mask of hold / reversal legs paired with a charge."""
+    return pd.Series(np.isin(df.index, pair_holds(df, window, time_col).index), index=df.index)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Pipeline Instrumentation
+
+Per-stage measurements for the pipeline scripts: wall time, CPU time, rows
+in and out and, when tracemalloc is tracing, peak memory. Each script keeps
+a RunReport and wraps its stages in ``report.stage(...)``; the report is
+written as JSON (--report) and/or printed as a summary table (--summary),
+so a refresh that suddenly got slower shows which stage regressed without
+rerunning it under a profiler.
+
+Wall and CPU times cost two clock reads per stage and are always recorded.
+Memory tracing slows allocation-heavy stages several times over, so it is
+opt-in (--trace-memory) and its timings are not comparable with untraced
+runs (the report says which kind it is).
+"""
+
+import contextlib
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+
+REPORT_VERSION = 1
+
+
+class Stage:
+    """Measurements of one stage run; ``rows_out`` is set by the caller."""
+
+    __slots__ = ('name', 'detail', 'rows_in', 'rows_out', 'wall_s', 'cpu_s', 'peak_mb')
+
+    def __init__(self, name, detail=None, rows_in=None):
+        self.name = name
+        self.detail = detail
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_s = None
+        self.cpu_s = None
+        self.peak_mb = None
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class RunReport:
+    """Stage measurements of one script run, in the order the stages ran."""
+
+    def __init__(self, script):
+        self.script = script
+        self.started = datetime.now()
+        self.clock = time.perf_counter()
+        self.memory_traced = tracemalloc.is_tracing()
+        self.stages = []
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None, detail=None):
+        """
+        Measure the enclosed block as stage ``name``. Yields the Stage so the
+        block can set ``rows_out``. Stages do not nest (peak memory is reset
+        at the start of each one).
+        """
+        record = Stage(name, detail, rows_in)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = round(time.perf_counter() - wall, 4)
+            record.cpu_s = round(time.process_time() - cpu, 4)
+            if tracing:
+                record.peak_mb = round((tracemalloc.get_traced_memory()[1] - start_memory) / 2**20, 2)
+            self.stages.append(record)
+
+    def extend(self, records):
+        """Add stages measured elsewhere (e.g. in worker processes) from their to_dict() output."""
+        for values in records:
+            record = Stage(values['name'])
+            for slot, value in values.items():
+                setattr(record, slot, value)
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'version': REPORT_VERSION,
+            'script': self.script,
+            'started': self.started.isoformat(timespec='seconds'),
+            'memory_traced': self.memory_traced,
+            'elapsed_s': round(time.perf_counter() - self.clock, 4),
+            'wall_s': round(sum(stage.wall_s or 0 for stage in self.stages), 4),
+            'cpu_s': round(sum(stage.cpu_s or 0 for stage in self.stages), 4),
+            'stages': [stage.to_dict() for stage in self.stages],
+        }
+
+    def write(self, path):
+        """Write the JSON run report to ``path``."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        """Human-readable table of the stages."""
+        def cell(value, width, fmt):
+            return format(value, f'{width}{fmt}') if value is not None else '-'.rjust(width)
+
+        lines = [f"{'Stage':40s} {'Wall s':>9s} {'CPU s':>9s} {'Rows in':>10s} {'Rows out':>10s} {'Peak MB':>9s}"]
+        for stage in self.stages:
+            label = f"{stage.name} ({stage.detail})" if stage.detail else stage.name
+            lines.append(f"{label[:40]:40s} {cell(stage.wall_s, 9, '.3f')} {cell(stage.cpu_s, 9, '.3f')} "
+                         f"{cell(stage.rows_in, 10, ',d')} {cell(stage.rows_out, 10, ',d')} "
+                         f"{cell(stage.peak_mb, 9, '.1f')}")
+        totals = self.to_dict()
+        lines.append(f"{'total (sum of stages)':40s} {totals['wall_s']:9.3f} {totals['cpu_s']:9.3f}")
+        lines.append(f"{'elapsed':40s} {totals['elapsed_s']:9.3f}")
+        return '\n'.join(lines)
+
+
+def add_report_arguments(parser):
+    """Add the --report / --summary / --trace-memory options to a script's parser."""
+    parser.add_argument('--report', help="Write a JSON run report with per-stage timings to this file")
+    parser.add_argument('--summary', action='store_true', help="Print a per-stage timing table at the end")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record peak memory per stage with tracemalloc (slows the run)")
+
+
+def start_report(script, args):
+    """RunReport for ``script``, tracing memory when --trace-memory was given."""
+    if getattr(args, 'trace_memory', False):
+        tracemalloc.start()
+    return RunReport(script)
+
+
+def finish_report(report, args):
+    """Write / print the report as the script's --report and --summary ask."""
+    if getattr(args, 'summary', False):
+        print("\n" + "="*60)
+        print("STAGE TIMINGS")
+        print("="*60)
+        print(report.summary())
+    if getattr(args, 'report', None):
+        report.write(args.report)
+        print(f"\n✓ Run report saved to: {args.report}")
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Money Amounts
+
+Dollar amounts held as int64 cents. Export amounts are parsed into cents
+once, when they are read (source_readers), and stay in cents through
+exclusion, dedup, hold pairing, refund netting, reconciliation and
+aggregation: cents compare and hash exactly (no float ``==``) and add up
+without drift. Dollars only come back when an audit is written or a total
+is printed.
+
+Cents columns carry the CENTS_SUFFIX (``Amount`` -> ``Amount_Cents``).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+CENTS_SUFFIX = '_Cents'
+
+
+def parse_cents(values):
+    """
+    Vectorized '$1,234.56' / '-$2.90' / '-15.99' text to integer cents;
+    unparseable and blank amounts are missing (nullable Int64).
+    """
+    cleaned = pd.Series(values, copy=False).astype(str).str.replace(r'[$,\s]', '', regex=True)
+    return to_cents(cleaned)
+
+
+def to_cents(dollars):
+    """
+    Dollar amounts (Series or array) as integer cents: int64, or nullable
+    Int64 when some amounts are missing.
+    """
+    values = pd.to_numeric(pd.Series(dollars, copy=False), errors='coerce')
+    cents = np.round(values * 100)
+    return cents.astype('Int64' if cents.isna().any() else 'int64')
+
+
+def from_cents(cents):
+    """Integer cents back to float dollars (the nearest float to the exact amount, NaN where missing)."""
+    return pd.Series(cents, copy=False).astype('float64') / 100
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Transaction Reconciliation Engine
+
+Matches audit rows against source export rows with hash joins instead of
+pairwise scans, so reconciling n audit rows against m source rows is O(n + m).
+A fuzzy mode tolerates settlement lag and fee differences using sorted as-of
+joins, O((n + m) log(n + m)) per round and cent of amount tolerance.
+
+Amount keys are integer cents (money.py), so exact matches are exact integer
+equality and amount tolerances are whole cents.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def reconcile_exact(left, right, left_on, right_on):
+    """
+    Multiplicity-aware exact match of two frames on key columns.
+
+    Each row matches at most one row on the other side: two identical
+    (date, amount) charges on the left need two identical rows on the right.
+    Rows with a missing key never match.
+
+    Returns (matched, unmatched_left, unmatched_right). ``matched`` has one row
+    per pair with the index labels of both sides in ``left_index`` and
+    ``right_index``; the unmatched frames are the leftover rows of each input.
+    """
+    left_pos, right_pos = _exact_positions(left, right, left_on, right_on)
+
+    matched = pd.DataFrame({
+        'left_index': left.index[left_pos],
+        'right_index': right.index[right_pos],
+    })
+
+    left_unmatched = np.ones(len(left), dtype=bool)
+    left_unmatched[left_pos] = False
+    right_unmatched = np.ones(len(right), dtype=bool)
+    right_unmatched[right_pos] = False
+
+    return matched, left.iloc[left_unmatched], right.iloc[right_unmatched]
+
+
+def reconcile_fuzzy(left, right, left_on, right_on, date_tolerance=pd.Timedelta(days=1),
+                    amount_tolerance=5, max_rounds=10):
+    """
+    One-to-one match of (date, amount) pairs within tolerances.
+
+    ``left_on`` / ``right_on`` are ``[date column, cents column]`` and
+    ``amount_tolerance`` is in whole cents. Exact
+    matches are taken first; the remaining rows are matched by as-of joins on
+    date, one per amount within tolerance of the left amount, so each left row
+    sees the nearest-dated right row at every amount it may match. Conflicts
+    go to the higher confidence pair and the losers retry against what is
+    left, for up to ``max_rounds`` rounds.
+
+    Returns (matched, unmatched_left, unmatched_right) like reconcile_exact,
+    with ``date_diff``, ``amount_diff`` (cents) and a ``confidence`` score per pair:
+    1.0 for an exact match, down to 0.5 at both tolerance limits.
+    """
+    date_tolerance = pd.Timedelta(date_tolerance)
+    left_pos, right_pos = _exact_positions(left, right, left_on, right_on)
+
+    pairs = [pd.DataFrame({
+        'pos_left': left_pos,
+        'pos_right': right_pos,
+        'date_diff': pd.to_timedelta(np.zeros(len(left_pos), dtype='int64'), unit='D'),
+        'amount_diff': np.zeros(len(left_pos), dtype='int64'),
+        'confidence': np.ones(len(left_pos)),
+    })]
+
+    left_rest = _fuzzy_keys(left, left_on, exclude=left_pos)
+    right_rest = _fuzzy_keys(right, right_on, exclude=right_pos)
+    deltas = range(-int(amount_tolerance), int(amount_tolerance) + 1)
+
+    for _ in range(max_rounds):
+        if left_rest.empty or right_rest.empty:
+            break
+        right_sorted = right_rest.assign(date_right=right_rest['date']).sort_values('date')
+        left_sorted = left_rest.sort_values('date')
+        right_amounts = right_rest['amount'].unique()
+
+        # Right amount = left amount + delta: every candidate is within the amount tolerance
+        candidates = []
+        for delta in deltas:
+            shifted = left_sorted.assign(amount=left_sorted['amount'] + delta)
+            shifted = shifted[shifted['amount'].isin(right_amounts)]
+            joined = pd.merge_asof(shifted, right_sorted, on='date', by='amount', direction='nearest',
+                                   tolerance=date_tolerance, suffixes=('_left', '_right'))
+            candidates.append(joined.dropna(subset=['pos_right']).assign(amount_diff=abs(delta)))
+        candidates = pd.concat(candidates, ignore_index=True)
+        if candidates.empty:
+            break
+
+        candidates['date_diff'] = (candidates['date'] - candidates['date_right']).abs()
+
+        date_share = candidates['date_diff'] / date_tolerance if date_tolerance > pd.Timedelta(0) else 0.0
+        amount_share = candidates['amount_diff'] / amount_tolerance if amount_tolerance > 0 else 0.0
+        candidates['confidence'] = 1.0 - 0.25 * (date_share + amount_share)
+
+        # Best candidate per left row, then the best claimant per right row
+        accepted = (candidates.sort_values('confidence', ascending=False, kind='stable')
+                    .drop_duplicates('pos_left')
+                    .drop_duplicates('pos_right'))
+        accepted = accepted.assign(pos_right=accepted['pos_right'].astype('int64'))
+        pairs.append(accepted[['pos_left', 'pos_right', 'date_diff', 'amount_diff', 'confidence']])
+
+        left_rest = left_rest[~left_rest['pos'].isin(accepted['pos_left'])]
+        right_rest = right_rest[~right_rest['pos'].isin(accepted['pos_right'])]
+
+    pairs = pd.concat(pairs, ignore_index=True)
+    left_pos = pairs['pos_left'].to_numpy(dtype='int64')
+    right_pos = pairs['pos_right'].to_numpy(dtype='int64')
+
+    matched = pd.DataFrame({
+        'left_index': left.index[left_pos],
+        'right_index': right.index[right_pos],
+        'date_diff': pairs['date_diff'].to_numpy(),
+        'amount_diff': pairs['amount_diff'].to_numpy(dtype='int64'),
+        'confidence': pairs['confidence'].to_numpy(),
+    })
+
+    left_unmatched = np.ones(len(left), dtype=bool)
+    left_unmatched[left_pos] = False
+    right_unmatched = np.ones(len(right), dtype=bool)
+    right_unmatched[right_pos] = False
+
+    return matched, left.iloc[left_unmatched], right.iloc[right_unmatched]
+
+
+def _fuzzy_keys(df, columns, exclude):
+    """Date and cents keys for rows not already matched."""
+    date_col, amount_col = columns
+    keys = pd.DataFrame({
+        'date': pd.to_datetime(df[date_col]).to_numpy(),
+        'amount': df[amount_col].array,
+        'pos': np.arange(len(df)),
+    })
+    return keys.drop(index=exclude).dropna().astype({'amount': 'int64'})
+
+
+def _exact_positions(left, right, left_on, right_on):
+    """Row positions of exact one-to-one key matches (hash join on key + occurrence)."""
+    left_keys = _occurrence_keys(left, left_on)
+    right_keys = _occurrence_keys(right, right_on)
+    pairs = left_keys.merge(right_keys, on=list(left_keys.columns[:-1]), how='inner',
+                            suffixes=('_left', '_right'))
+    return pairs['_pos_left'].to_numpy(), pairs['_pos_right'].to_numpy()
+
+
+def _occurrence_keys(df, columns):
+    """Key columns plus the occurrence number of each key and the row position."""
+    keys = pd.DataFrame({f'_key{i}': df[col].array for i, col in enumerate(columns)})
+    keys['_pos'] = np.arange(len(df))
+    keys = keys.dropna()
+    key_columns = [f'_key{i}' for i in range(len(columns))]
+    keys['_occurrence'] = keys.groupby(key_columns, sort=False).cumcount()
+    return keys[key_columns + ['_occurrence', '_pos']]
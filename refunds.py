@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Refund Netting Engine
+
+Matches merchant refunds to the purchase they reverse so a refunded
+purchase stops counting as spend. Refunds and purchases are bucketed by
+(merchant, Amount_Cents) and joined with backward as-of joins inside a
+lookback window, so netting stays O(n log n) on years of history.
+
+Full refunds are matched first on the exact amount. Remaining refunds are
+treated as partial and netted against the most recent earlier purchase
+from the same merchant that still has enough un-refunded amount left.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Credits that are merchant refunds (P2P payments received are not)
+REFUND_TYPES = ['Payment Refund', 'General PayPal Debit Card Transaction', 'Cash Card']
+
+# How far back a refund may reach for its purchase
+REFUND_LOOKBACK = pd.Timedelta(days=90)
+
+
+def net_refunds(df, lookback=REFUND_LOOKBACK, max_rounds=10):
+    """
+    Net refunds against purchases.
+
+    Refunds are credits of a REFUND_TYPES type excluded as "Money In /
+    Refund"; purchases are included outgoing rows. Both need a merchant name
+    and a date. Returns (refunded, matches): ``refunded`` is the positive
+    number of cents refunded per row of ``df`` (0 where nothing was), and
+    ``matches`` has one row per refund with ``refund_index``,
+    ``purchase_index``, ``cents`` and ``partial``.
+    """
+    merchant = df['Name'].fillna('').astype(str).str.lower().str.strip()
+    amounts = df['Amount_Cents']
+    valid = (merchant != '') & df['Date'].notna() & amounts.notna()
+    amounts = amounts.fillna(0)
+    is_refund = (valid & (amounts > 0) & df['Type'].isin(REFUND_TYPES)
+                 & (df['Exclusion_Reason'] == 'Money In / Refund'))
+    is_purchase = valid & (amounts < 0) & (df['Analysis_Status'] == 'Included (True Spend)')
+
+    codes, _ = pd.factorize(merchant)
+    keys = pd.DataFrame({
+        'date': pd.to_datetime(df['Date']).to_numpy(),
+        'merchant': codes,
+        'cents': amounts.abs().to_numpy(dtype='int64'),
+        'pos': np.arange(len(df)),
+    })
+    refunds = keys[is_refund.to_numpy()]
+    purchases = keys[is_purchase.to_numpy()]
+
+    # Un-refunded cents per row position (purchases only)
+    remaining = np.zeros(len(df), dtype='int64')
+    remaining[purchases['pos'].to_numpy()] = purchases['cents'].to_numpy()
+    matches = []
+
+    # Full refunds: same merchant and amount, one refund per purchase
+    for _ in range(max_rounds):
+        open_purchases = purchases[remaining[purchases['pos'].to_numpy()] == purchases['cents'].to_numpy()]
+        accepted = _nearest_earlier(refunds, open_purchases, ['merchant', 'cents'], lookback)
+        accepted = accepted.drop_duplicates('pos_purchase')
+        if accepted.empty:
+            break
+        matches.append(accepted.assign(partial=False))
+        remaining[accepted['pos_purchase'].to_numpy()] = 0
+        refunds = refunds[~refunds['pos'].isin(accepted['pos_refund'])]
+
+    # Partial refunds: the most recent earlier purchase from the same merchant
+    # that still has enough left. Purchases are numbered in time order and
+    # keyed by (merchant, number), so a refund's window is one contiguous slice.
+    purchases = purchases.sort_values(['date', 'pos'], kind='stable')
+    purchases = purchases.assign(seq=np.arange(len(purchases)))
+    dates = purchases['date'].to_numpy()
+    refunds = refunds.assign(seq=np.searchsorted(dates, refunds['date'].to_numpy(), side='right') - 1,
+                             first_seq=np.searchsorted(dates, (refunds['date'] - lookback).to_numpy()))
+    span = len(purchases) + 1
+    purchases = purchases.assign(key=purchases['merchant'] * span + purchases['seq']).sort_values('key')
+    left = remaining[purchases['pos'].to_numpy()]
+    purchases = purchases[left > 0].assign(left=left[left > 0])
+
+    # One as-of pass settles most of them: per purchase, refunds in date order while they fit
+    candidates = _latest_before(refunds, purchases, lookback)
+    candidates = candidates.sort_values(['pos_purchase', 'date', 'pos_refund'], kind='stable')
+    already = candidates.groupby('pos_purchase')['cents'].cumsum().to_numpy()
+    accepted = candidates[already <= remaining[candidates['pos_purchase'].to_numpy()]]
+    matches.append(accepted[['pos_refund', 'pos_purchase', 'cents']].assign(partial=True))
+    np.subtract.at(remaining, accepted['pos_purchase'].to_numpy(), accepted['cents'].to_numpy())
+
+    # The few that did not fit their candidate go one at a time, in date order,
+    # to the latest purchase in their window that still has enough left
+    # (refunds without a candidate have no purchase with enough left at all)
+    unfit = candidates['pos_refund'][~candidates['pos_refund'].isin(accepted['pos_refund'])]
+    unfit = refunds[refunds['pos'].isin(unfit)].sort_values(['date', 'pos'], kind='stable')
+    keys, positions = purchases['key'].to_numpy(), purchases['pos'].to_numpy()
+    left = remaining[positions]
+    tail = []
+    for row in unfit.itertuples(index=False):
+        lo = np.searchsorted(keys, row.merchant * span + row.first_seq)
+        hi = np.searchsorted(keys, row.merchant * span + row.seq, side='right')
+        fit = np.flatnonzero(left[lo:hi] >= row.cents)
+        if fit.size:
+            i = lo + fit[-1]
+            left[i] -= row.cents
+            remaining[positions[i]] -= row.cents
+            tail.append((row.pos, positions[i], row.cents))
+    matches.append(pd.DataFrame(tail, columns=['pos_refund', 'pos_purchase', 'cents'], dtype='int64')
+                   .assign(partial=True))
+
+    if matches:
+        matches = pd.concat(matches, ignore_index=True)
+    else:
+        matches = pd.DataFrame({'pos_refund': [], 'pos_purchase': [], 'cents': [], 'partial': []}).astype(
+            {'pos_refund': 'int64', 'pos_purchase': 'int64', 'cents': 'int64', 'partial': bool})
+
+    refunded_cents = np.zeros(len(df), dtype='int64')
+    np.add.at(refunded_cents, matches['pos_purchase'].to_numpy(dtype='int64'), matches['cents'].to_numpy(dtype='int64'))
+    refunded = pd.Series(refunded_cents, index=df.index)
+
+    matches = pd.DataFrame({
+        'refund_index': df.index[matches['pos_refund'].to_numpy(dtype='int64')],
+        'purchase_index': df.index[matches['pos_purchase'].to_numpy(dtype='int64')],
+        'cents': matches['cents'].to_numpy(dtype='int64'),
+        'partial': matches['partial'].to_numpy(dtype=bool),
+    })
+    return refunded, matches
+
+
+def _latest_before(refunds, purchases, lookback):
+    """
+    For each refund, the latest open purchase of the same merchant numbered
+    at or below the refund's ``seq`` and within lookback of the refund
+    (``purchases`` carries the cents each has ``left``).
+    """
+    columns = ['pos_refund', 'pos_purchase', 'cents', 'date']
+    if refunds.empty or purchases.empty:
+        return pd.DataFrame({col: pd.Series(dtype='int64') for col in columns})
+    # Refunds of 2**k..2**(k+1)-1 cents only look at purchases of their
+    # merchants with at least 2**k left
+    purchases = purchases.sort_values('seq')
+    right = purchases[['merchant', 'seq', 'pos', 'date']]
+    merchants, left_cents = purchases['merchant'].to_numpy(), purchases['left'].to_numpy()
+    bands = np.floor(np.log2(refunds['cents'].to_numpy())).astype('int64')
+    joined = []
+    for band in np.unique(bands):
+        left = refunds[bands == band].sort_values('seq')
+        candidates = np.isin(merchants, left['merchant'].to_numpy()) & (left_cents >= 2 ** band)
+        joined.append(pd.merge_asof(left, right[candidates], on='seq', by='merchant',
+                                    direction='backward', suffixes=('', '_purchase')))
+    joined = pd.concat(joined, ignore_index=True).dropna(subset=['pos_purchase'])
+    joined = joined[joined['date'] - joined['date_purchase'] <= lookback]
+    return pd.DataFrame({
+        'pos_refund': joined['pos'].to_numpy(dtype='int64'),
+        'pos_purchase': joined['pos_purchase'].to_numpy(dtype='int64'),
+        'cents': joined['cents'].to_numpy(dtype='int64'),
+        'date': joined['date'].to_numpy(),
+    })
+
+
+def _nearest_earlier(refunds, purchases, by, lookback):
+    """Most recent purchase at or before each refund (within lookback) sharing the ``by`` keys."""
+    if refunds.empty or purchases.empty:
+        return pd.DataFrame(columns=['pos_refund', 'pos_purchase', 'cents'])
+    left = refunds.sort_values('date')
+    right = purchases[by + ['date', 'pos']].sort_values('date')
+    joined = pd.merge_asof(left, right, on='date', by=by, direction='backward',
+                           tolerance=lookback, suffixes=('_refund', '_purchase'))
+    joined = joined.dropna(subset=['pos_purchase'])
+    return pd.DataFrame({
+        'pos_refund': joined['pos_refund'].to_numpy(dtype='int64'),
+        'pos_purchase': joined['pos_purchase'].to_numpy(dtype='int64'),
+        'cents': joined['cents'].to_numpy(dtype='int64'),
+    })
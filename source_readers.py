@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Source Export Readers
+
+Schema-aware loaders for the PayPal personal (personal-6.CSV), PayPal
+business (Download-6.CSV) and Cash App (cash_app_report_*.csv) exports.
+
+Each reader detects the encoding once from the byte-order mark, loads only
+the columns the pipeline uses as text, and then converts dates with explicit
+formats and amounts to integer cents (``Gross`` -> ``Gross_Cents``, see
+money.py). The pyarrow CSV engine is used when it is installed.
+"""
+
+import codecs
+
+import pandas as pd
+
+from money import CENTS_SUFFIX, parse_cents
+
+try:
+    import pyarrow  # noqa: F401  (enables pandas' pyarrow CSV engine)
+except ImportError:
+    pyarrow = None
+
+
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Columns used downstream, per export schema
+PAYPAL_PERSONAL_COLUMNS = [
+    'Date', 'Time', 'TimeZone', 'Name', 'Type', 'Status', 'Currency',
+    'Gross', 'Fees', 'Total', 'Transaction ID',
+]
+PAYPAL_BUSINESS_COLUMNS = [
+    'Date', 'Time', 'TimeZone', 'Name', 'Type', 'Status', 'Currency',
+    'Gross', 'Fee', 'Net', 'Transaction ID', 'Reference Txn ID',
+]
+CASHAPP_COLUMNS = [
+    'Date', 'Transaction ID', 'Transaction Type', 'Currency', 'Amount', 'Fee',
+    'Net Amount', 'Status', 'Notes', 'Name of sender/receiver',
+]
+
+PAYPAL_AMOUNT_COLUMNS = ['Gross', 'Fees', 'Fee', 'Total', 'Net']
+CASHAPP_AMOUNT_COLUMNS = ['Amount', 'Fee', 'Net Amount']
+
+PAYPAL_DATE_FORMAT = '%m/%d/%Y'
+CASHAPP_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def detect_encoding(path):
+    """Encoding from the file's byte-order mark (UTF-8 when there is none)."""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    for bom, encoding in BOM_ENCODINGS:
+        if head.startswith(bom):
+            return encoding
+    return 'utf-8'
+
+
+def default_engine():
+    """Fastest available pandas CSV engine."""
+    return 'pyarrow' if pyarrow is not None else 'c'
+
+
+def read_export(path, columns, engine=None):
+    """
+    Read the wanted ``columns`` of an export as text.
+
+    Columns missing from the file are skipped. Files without a BOM that are
+    not valid UTF-8 are retried once as Latin-1.
+    """
+    encoding = detect_encoding(path)
+    header = pd.read_csv(path, nrows=0, encoding=encoding, encoding_errors='replace').columns
+    usecols = [col for col in columns if col in header]
+    options = {'usecols': usecols, 'dtype': {col: str for col in usecols}, 'engine': engine or default_engine()}
+    try:
+        return pd.read_csv(path, encoding=encoding, **options)
+    except UnicodeDecodeError:
+        if encoding != 'utf-8':
+            raise
+        return pd.read_csv(path, encoding='latin-1', **options)
+
+
+def read_paypal_personal(path, engine=None):
+    """Load a PayPal personal export (Total = net amount)."""
+    return _finish_paypal(read_export(path, PAYPAL_PERSONAL_COLUMNS, engine))
+
+
+def read_paypal_business(path, engine=None):
+    """Load a PayPal business export (Net = amount after fees)."""
+    return _finish_paypal(read_export(path, PAYPAL_BUSINESS_COLUMNS, engine))
+
+
+def read_paypal(path, engine=None):
+    """Load either PayPal export, choosing the schema from the header."""
+    header = pd.read_csv(path, nrows=0, encoding=detect_encoding(path), encoding_errors='replace').columns
+    if 'Net' in header:
+        return read_paypal_business(path, engine)
+    return read_paypal_personal(path, engine)
+
+
+def read_cashapp(path, engine=None):
+    """
+    Load a Cash App report.
+
+    Dates look like "2025-03-12 02:02:18 EDT"; the timezone abbreviation is
+    split into a TimeZone column and Date holds the local wall-clock time.
+    """
+    df = read_export(path, CASHAPP_COLUMNS, engine)
+    raw_dates = df['Date'].fillna('')
+    df['Date'] = pd.to_datetime(raw_dates.str[:19], format=CASHAPP_DATE_FORMAT, errors='coerce')
+    df['TimeZone'] = raw_dates.str[20:].str.strip()
+    return _amounts_to_cents(df, CASHAPP_AMOUNT_COLUMNS)
+
+
+def _finish_paypal(df):
+    df['Date'] = pd.to_datetime(df['Date'], format=PAYPAL_DATE_FORMAT, errors='coerce')
+    return _amounts_to_cents(df, PAYPAL_AMOUNT_COLUMNS)
+
+
+def _amounts_to_cents(df, columns):
+    """Parse amount text columns into cents columns, in place of the text."""
+    amounts = [col for col in columns if col in df.columns]
+    for col in amounts:
+        df[col] = parse_cents(df[col])
+    return df.rename(columns={col: col + CENTS_SUFFIX for col in amounts})
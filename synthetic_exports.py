@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Synthetic Source Exports
+
+Writes PayPal personal (personal-6.CSV), PayPal business (Download-6.CSV)
+and Cash App (cash_app_report_*.csv) shaped exports of any size, for
+benchmarking the pipeline without real account data.
+
+Rows are generated from money movements the way the real exports record
+them: a debit card charge is an authorization, an account hold, the card
+transaction and the hold reversal, all stamped with the same time; business
+P2P payments come with the card deposit that funded them (linked by
+Reference Txn ID); refunds credit an earlier purchase; denied card deposits,
+subscriptions, ATM withdrawals, Cash App deposits and P2P transfers fill out
+the mix. Merchants repeat with a long-tailed distribution, so a small set
+of names covers most rows while new names keep appearing as the data grows.
+
+Usage:
+    python3 synthetic_exports.py --rows 100000 --out-dir bench_data
+"""
+
+import argparse
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Share of all rows written to each export
+FILE_SHARES = {'personal': 0.41, 'business': 0.37, 'cashapp': 0.22}
+
+PERSONAL_FILE = 'personal-6.CSV'
+BUSINESS_FILE = 'Download-6.CSV'
+CASHAPP_FILE = 'cash_app_report_synthetic.csv'
+
+PERSONAL_HEADER = [
+    'Date', 'Time', 'TimeZone', 'Name', 'Type', 'Status', 'Currency', 'Gross', 'Fees', 'Total',
+    'Exchange Rate', 'Receipt ID', 'Balance', 'Transaction ID', 'Item Title',
+]
+BUSINESS_HEADER = [
+    'Date', 'Time', 'TimeZone', 'Name', 'Type', 'Status', 'Currency', 'Gross', 'Fee', 'Net',
+    'From Email Address', 'To Email Address', 'Transaction ID', 'Item Title', 'Item ID',
+    'Option 1 Name', 'Option 1 Value', 'Option 2 Name', 'Option 2 Value', 'Reference Txn ID',
+    'Custom Number', 'Quantity', 'Receipt ID', 'Balance', 'Subject',
+]
+CASHAPP_HEADER = [
+    'Date', 'Transaction ID', 'Transaction Type', 'Currency', 'Amount', 'Fee', 'Net Amount',
+    'Asset Type', 'Asset Price', 'Asset Amount', 'Status', 'Notes', 'Name of sender/receiver', 'Account',
+]
+
+# Frequent merchants (hit the categorization rules); the long tail is generated
+MERCHANTS = [
+    'UBER *TRIP', 'LYFT *RIDE', 'MTA*NYCT PAYGO', 'DOORDASH*ORDER', 'UBER EATS', 'GRUBHUB*SEAMLESS',
+    'INSTACART', 'TRADER JOE S #540', 'WHOLE FOODS MKT', 'CVS/PHARMACY #1234', 'WALGREENS #9876',
+    'DUANE READE', 'KEY FOOD', '7-ELEVEN 35012', 'NEW YORK SMOKE SHOP', 'MCDONALD S F1234',
+    'CHIPOTLE 2345', 'SHAKE SHACK', 'TST* JOES PIZZA', 'SQ *CORNER CAFE', 'MAMA PHO - GRAND ST',
+    'NETFLIX.COM', 'SPOTIFY USA', 'GOOGLE *YOUTUBE', 'AMAZON PRIME', 'AMC THEATRES', 'TARGET 00012',
+    'WALMART.COM', 'NIKE.COM', 'CHIME', 'VERIZON WIRELESS', 'T-MOBILE', 'CON ED ELECTRIC',
+    'LAUNDRY CITY', 'FEDEX OFFICE', 'PLANET FITNESS', 'SHELL OIL 5744', 'CITI BIKE', 'CLEO AI',
+    'ALLIANZ INSURANCE',
+]
+SUBSCRIPTIONS = ['Apple Services', 'Netflix', 'Spotify', 'Google', 'Microsoft', 'Adobe']
+PEOPLE = ['Alex Rivera', 'Sam Chen', 'Jordan Lee', 'Taylor Brooks', 'Morgan Diaz', 'Casey Patel',
+          'Riley Nguyen', 'Jamie Ortiz', 'Avery Kim', 'Quinn Walker']
+
+# Money movements per export: (event, share of events)
+PAYPAL_EVENTS = [
+    ('card_charge', 0.40), ('subscription', 0.08), ('p2p_out', 0.10), ('p2p_in', 0.06),
+    ('denied_deposit', 0.17), ('refund', 0.03), ('withdrawal', 0.03), ('other', 0.13),
+]
+CASHAPP_EVENTS = [
+    ('card_charge', 0.55), ('failed_charge', 0.05), ('p2p_out', 0.08), ('p2p_in', 0.07),
+    ('deposit', 0.13), ('withdrawal', 0.06), ('refund', 0.03), ('notification', 0.03),
+]
+
+# PayPal legs per event: (Type, Status, amount sign, name kind); name kinds are
+# 'merchant', 'subscription', 'person', 'paypal' or '' (no name)
+PAYPAL_LEGS = {
+    'card_charge': [
+        ('General Authorization', 'Completed', -1, 'merchant'),
+        ('Account Hold for Open Authorization', 'Pending', -1, 'paypal'),
+        ('General PayPal Debit Card Transaction', 'Completed', -1, 'merchant'),
+        ('Reversal of General Account Hold', 'Completed', 1, 'paypal'),
+    ],
+    'subscription': [('PreApproved Payment Bill User Payment', 'Completed', -1, 'subscription')],
+    'p2p_out': [('Mobile Payment', 'Completed', -1, 'person')],
+    'p2p_in': [('Mobile Payment', 'Completed', 1, 'person')],
+    'denied_deposit': [('General Card Deposit', 'Denied', 1, '')],
+    'refund': [('Payment Refund', 'Completed', 1, 'merchant')],
+    'withdrawal': [('PayPal Debit Card Withdrawal to ATM', 'Completed', -1, '')],
+    'other': [('General Payment', 'Completed', -1, 'merchant')],
+}
+# Business exports link legs of one movement: (event, leg) -> leg it references
+BUSINESS_REFERENCES = {('card_charge', 2): 0, ('card_charge', 3): 1, ('p2p_out', 1): 0}
+
+CASHAPP_LEGS = {
+    'card_charge': ('Cash Card', 'COMPLETE', -1, 'merchant'),
+    'failed_charge': ('Cash Card', 'FAILED', -1, 'merchant'),
+    'p2p_out': ('P2P', 'COMPLETE', -1, 'person'),
+    'p2p_in': ('P2P', 'COMPLETE', 1, 'person'),
+    'deposit': ('Deposits', 'COMPLETE', 1, ''),
+    'withdrawal': ('Withdrawal', 'COMPLETE', -1, ''),
+    'refund': ('Cash Card', 'COMPLETE', 1, 'merchant'),
+    'notification': ('Account Notifications', 'COMPLETE', 0, ''),
+}
+
+# Unique merchant names per generated row (long tail beyond MERCHANTS)
+TAIL_MERCHANT_RATE = 0.02
+
+
+def parse_size(text):
+    """Row count from '10k', '1M', '2.5m' or a plain integer."""
+    text = str(text).strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def merchant_pool(rows):
+    """Frequent merchants followed by the generated long tail."""
+    tail = max(1, int(rows * TAIL_MERCHANT_RATE))
+    return np.array(MERCHANTS + [f'MERCHANT {k:06d} LLC' for k in range(tail)], dtype=object)
+
+
+def long_tail_choice(rng, pool, size, exponent=1.2):
+    """Draw from ``pool`` with Zipf-like weights (earlier entries repeat most)."""
+    weights = 1.0 / np.arange(1, len(pool) + 1) ** exponent
+    return pool[rng.choice(len(pool), size=size, p=weights / weights.sum())]
+
+
+def random_events(rng, count, mix, start, months):
+    """Event kinds, times (whole seconds) and positive amounts, in time order."""
+    kinds, shares = zip(*mix)
+    span = int((pd.Timestamp(start) + pd.DateOffset(months=months) - pd.Timestamp(start)).total_seconds())
+    offsets = np.sort(rng.integers(0, span, size=count))
+    cents = np.round(rng.lognormal(mean=7.6, sigma=1.1, size=count)).astype('int64') + 50
+    return pd.DataFrame({
+        'kind': np.array(kinds, dtype=object)[rng.choice(len(kinds), size=count, p=np.array(shares) / sum(shares))],
+        'time': pd.Timestamp(start) + pd.to_timedelta(offsets, unit='s'),
+        'amount': cents / 100,
+    })
+
+
+def event_names(rng, events, pool):
+    """Merchant, subscription and person name for every event."""
+    return {
+        'merchant': long_tail_choice(rng, pool, len(events)),
+        'subscription': np.array(SUBSCRIPTIONS, dtype=object)[rng.integers(0, len(SUBSCRIPTIONS), len(events))],
+        'person': np.array(PEOPLE, dtype=object)[rng.integers(0, len(PEOPLE), len(events))],
+        'paypal': np.full(len(events), 'PayPal', dtype=object),
+        '': np.full(len(events), '', dtype=object),
+    }
+
+
+def refund_earlier_purchases(rng, events, names):
+    """Point refunds at an earlier card charge's merchant and (mostly) its full amount."""
+    charges = np.flatnonzero(events['kind'].to_numpy() == 'card_charge')
+    refunds = np.flatnonzero(events['kind'].to_numpy() == 'refund')
+    if len(charges) == 0 or len(refunds) == 0:
+        return
+    earlier = np.searchsorted(charges, refunds) - 1
+    refunds, earlier = refunds[earlier >= 0], earlier[earlier >= 0]
+    back = np.minimum(rng.integers(0, 20, len(refunds)), earlier)
+    purchase = charges[earlier - back]
+    names['merchant'][refunds] = names['merchant'][purchase]
+    partial = rng.random(len(refunds)) < 0.25
+    amounts = events['amount'].to_numpy(copy=True)
+    amounts[refunds] = np.where(partial, np.round(amounts[purchase] * 0.5, 2), amounts[purchase])
+    events['amount'] = amounts
+
+
+def transaction_ids(prefix, count, offset=0):
+    """17-character transaction IDs unique within an export."""
+    return pd.Series(np.arange(offset, offset + count)).map(lambda i: f'{prefix}{i:016X}').to_numpy(dtype=object)
+
+
+def paypal_rows(rng, rows, pool, prefix, start, months, business):
+    """Rows of a PayPal export as a typed frame (Timestamp, Name, Type, Status, Amount, IDs)."""
+    legs_per_event = sum(share * len(PAYPAL_LEGS[kind]) for kind, share in PAYPAL_EVENTS)
+    events = random_events(rng, int(rows / legs_per_event) + 1, PAYPAL_EVENTS, start, months)
+    names = event_names(rng, events, pool)
+    refund_earlier_purchases(rng, events, names)
+
+    # Business P2P payments are funded by a linked card deposit
+    legs = dict(PAYPAL_LEGS)
+    if business:
+        legs['p2p_out'] = legs['p2p_out'] + [('General Card Deposit', 'Completed', 1, '')]
+
+    parts = []
+    for kind, kind_legs in legs.items():
+        selected = np.flatnonzero(events['kind'].to_numpy() == kind)
+        for leg, (txn_type, status, sign, name_kind) in enumerate(kind_legs):
+            parts.append(pd.DataFrame({
+                'event': selected,
+                'leg': leg,
+                'Timestamp': events['time'].to_numpy()[selected],
+                'Name': names[name_kind][selected],
+                'Type': txn_type,
+                'Status': status,
+                'Amount': sign * events['amount'].to_numpy()[selected],
+            }))
+    df = pd.concat(parts, ignore_index=True).sort_values(['Timestamp', 'event', 'leg'], kind='stable')
+    df = df.iloc[:rows].reset_index(drop=True)
+    df['Transaction ID'] = transaction_ids(prefix, len(df))
+
+    # Settlements reference their authorization, reversals their hold, funding deposits their payment
+    df['Reference Txn ID'] = ''
+    if business:
+        kinds = events['kind'].to_numpy()[df['event'].to_numpy()]
+        position = pd.Series(np.arange(len(df)), index=pd.MultiIndex.from_arrays([df['event'], df['leg']]))
+        for (kind, leg), target_leg in BUSINESS_REFERENCES.items():
+            linked = np.flatnonzero((kinds == kind) & (df['leg'] == leg).to_numpy())
+            targets = position.reindex(pd.MultiIndex.from_arrays([df['event'].to_numpy()[linked],
+                                                                  np.full(len(linked), target_leg)])).to_numpy()
+            found = ~np.isnan(targets)
+            df.loc[linked[found], 'Reference Txn ID'] = df['Transaction ID'].to_numpy()[targets[found].astype('int64')]
+    return df
+
+
+def cashapp_rows(rng, rows, pool, start, months):
+    """Rows of a Cash App report as a typed frame."""
+    events = random_events(rng, rows, CASHAPP_EVENTS, start, months)
+    names = event_names(rng, events, pool)
+    refund_earlier_purchases(rng, events, names)
+
+    legs = {field: events['kind'].map({kind: leg[i] for kind, leg in CASHAPP_LEGS.items()})
+            for i, field in enumerate(['Type', 'Status', 'sign', 'name_kind'])}
+    name_kinds = legs['name_kind'].to_numpy()
+    df = pd.DataFrame({
+        'Timestamp': events['time'],
+        'Type': legs['Type'],
+        'Status': legs['Status'],
+        'Amount': legs['sign'].to_numpy() * events['amount'].to_numpy(),
+    })
+    df['Notes'] = np.select([name_kinds == kind for kind in ('merchant', 'person')],
+                            [names['merchant'], names['person']], default='')
+    df.loc[df['Type'] == 'Deposits', 'Notes'] = 'Direct deposit'
+    df.loc[df['Type'] == 'Account Notifications', 'Notes'] = 'New device login'
+    df['Sender'] = np.where(name_kinds == 'person', names['person'], '')
+    # Cash App lists the newest transaction first
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def format_times(times, fmt):
+    """strftime over a datetime Series, formatting each distinct value once."""
+    codes, uniques = pd.factorize(times)
+    return pd.Index(uniques).strftime(fmt).to_numpy(dtype=object)[codes]
+
+
+def format_money(amounts, dollar_sign=False):
+    """'-15.99' text (or '-$15.99' when ``dollar_sign``) for float amounts."""
+    cents = np.round(np.asarray(amounts, dtype=float) * 100).astype('int64')
+    text = pd.Series(np.abs(cents)).map(lambda c: f'{c // 100}.{c % 100:02d}').to_numpy(dtype=object)
+    sign = np.where(cents < 0, '-', '')
+    return sign + ('$' if dollar_sign else '') + text
+
+
+def write_paypal(df, path, business):
+    """Write a PayPal frame in the export's column layout (BOM, all fields quoted)."""
+    header = BUSINESS_HEADER if business else PERSONAL_HEADER
+    out = pd.DataFrame('', index=df.index, columns=header)
+    out['Date'] = format_times(df['Timestamp'].dt.normalize(), '%m/%d/%Y')
+    out['Time'] = format_times(df['Timestamp'] - df['Timestamp'].dt.normalize() + pd.Timestamp(0), '%H:%M:%S')
+    out['TimeZone'] = 'PST'
+    out['Name'] = df['Name'].to_numpy()
+    out['Type'] = df['Type'].to_numpy()
+    out['Status'] = df['Status'].to_numpy()
+    out['Currency'] = 'USD'
+    gross = format_money(df['Amount'])
+    out['Gross'] = gross
+    out['Fee' if business else 'Fees'] = '0.00'
+    out['Net' if business else 'Total'] = gross
+    out['Transaction ID'] = df['Transaction ID'].to_numpy()
+    if business:
+        out['Reference Txn ID'] = df['Reference Txn ID'].to_numpy()
+    out.to_csv(path, index=False, quoting=csv.QUOTE_ALL, encoding='utf-8-sig')
+
+
+def write_cashapp(df, path):
+    """Write a Cash App frame in the report's column layout."""
+    out = pd.DataFrame('', index=df.index, columns=CASHAPP_HEADER)
+    out['Date'] = format_times(df['Timestamp'], '%Y-%m-%d %H:%M:%S') + ' EDT'
+    out['Transaction Type'] = df['Type'].to_numpy()
+    out['Currency'] = 'USD'
+    amount = format_money(df['Amount'], dollar_sign=True)
+    out['Amount'] = amount
+    out['Fee'] = '$0.00'
+    out['Net Amount'] = amount
+    out['Status'] = df['Status'].to_numpy()
+    out['Notes'] = df['Notes'].to_numpy()
+    out['Name of sender/receiver'] = df['Sender'].to_numpy()
+    out['Account'] = 'Cash Balance'
+    out.to_csv(path, index=False, quoting=csv.QUOTE_ALL)
+
+
+def generate_exports(rows, out_dir, seed=0, start='2025-01-01', months=12):
+    """
+    Write the three exports with ``rows`` rows in total under ``out_dir``.
+
+    Returns {file path: row count}.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    pool = merchant_pool(rows)
+    counts = {kind: max(1, int(rows * share)) for kind, share in FILE_SHARES.items()}
+
+    written = {}
+    for kind, filename in (('personal', PERSONAL_FILE), ('business', BUSINESS_FILE)):
+        business = kind == 'business'
+        df = paypal_rows(rng, counts[kind], pool, 'B' if business else 'P', start, months, business)
+        path = os.path.join(out_dir, filename)
+        write_paypal(df, path, business)
+        written[path] = len(df)
+
+    df = cashapp_rows(rng, counts['cashapp'], pool, start, months)
+    path = os.path.join(out_dir, CASHAPP_FILE)
+    write_cashapp(df, path)
+    written[path] = len(df)
+    return written
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Write synthetic PayPal / Cash App exports for benchmarking.")
+    parser.add_argument('--rows', default='10k', help="Total rows across all exports, e.g. 10k, 1M (default: 10k)")
+    parser.add_argument('--out-dir', default='synthetic_exports',
+                        help="Directory to write to (default: synthetic_exports)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--start', default='2025-01-01', help="First day covered (default: 2025-01-01)")
+    parser.add_argument('--months', type=int, default=12, help="Months covered (default: 12)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows = parse_size(args.rows)
+
+    print("="*60)
+    print(f"SYNTHETIC EXPORTS - {rows:,} ROWS")
+    print("="*60)
+
+    written = generate_exports(rows, args.out_dir, args.seed, args.start, args.months)
+    for path, count in written.items():
+        print(f"✓ {path}: {count:,} rows")
+
+
+if __name__ == "__main__":
+    main()
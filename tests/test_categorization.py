@@ -0,0 +1,15 @@
+import shutil
+
+from categorization import RULES_FILE, load_rulesets
+
+
+def test_unreadable_compiled_rules_are_recompiled(tmp_path):
+    rules = tmp_path / 'rules.toml'
+    shutil.copy(RULES_FILE, rules)
+    # Pickled with a class that no longer exists (loading raises ModuleNotFoundError)
+    (tmp_path / 'rules.compiled.pickle').write_bytes(b'cno_such_module\nMatcher\n.')
+
+    matchers = load_rulesets(str(rules))
+
+    assert 'audit' in matchers
+    assert matchers['audit'].match('netflix.com') == load_rulesets()['audit'].match('netflix.com')
@@ -0,0 +1,55 @@
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from dashboard_cube import display_category
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARDS = ['unified-dashboard-ultimate.html', 'spending-dashboard.html', 'spending-dashboard-optimized.html']
+
+
+def category_remap_source(path):
+    """The categoryRemap(rawGroup, rawSubCat, description) method of a dashboard, as a JS function expression."""
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    start = html.index('categoryRemap(rawGroup, rawSubCat, description) {')
+    depth = 0
+    for end in range(html.index('{', start), len(html)):
+        depth += {'{': 1, '}': -1}.get(html[end], 0)
+        if depth == 0:
+            break
+    return 'function ' + html[start:end + 1]
+
+
+def remap_cases(source):
+    """(group, category, description) triples built from every string literal in the JS remap."""
+    literals = sorted(set(re.findall(r"'([^']*)'", source)) | {''})
+    keywords = sorted({literal.lower() for literal in literals})
+    cases = [(g, s, d) for g, s in itertools.product(literals, literals) for d in ('', 'us mobile', 'cash app')]
+    cases += [(g, '', f'{a} {b}'.strip()) for g in ('Other', 'Unknown', '') for a in keywords for b in keywords]
+    return cases
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="needs node to run the dashboard JS")
+@pytest.mark.parametrize('dashboard', DASHBOARDS)
+def test_display_category_matches_dashboard_category_remap(dashboard, tmp_path):
+    source = category_remap_source(os.path.join(ROOT, dashboard))
+    cases = remap_cases(source)
+    (tmp_path / 'cases.json').write_text(json.dumps(cases))
+    script = tmp_path / 'remap.js'
+    script.write_text(f"const remap = {source};\n"
+                      "const cases = JSON.parse(require('fs').readFileSync(process.argv[2], 'utf8'));\n"
+                      "const labels = cases.map(([g, s, d]) => { const r = remap(g, s, d); return r && [r.group, r.cat]; });\n"
+                      "process.stdout.write(JSON.stringify(labels));\n")
+    result = subprocess.run(['node', str(script), str(tmp_path / 'cases.json')], check=True, capture_output=True,
+                            text=True)
+
+    expected = json.loads(result.stdout)
+    mismatches = [(case, js) for case, js in zip(cases, expected)
+                  if list(display_category(*case) or []) != (js or [])]
+    assert not mismatches[:10]
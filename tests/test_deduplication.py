@@ -0,0 +1,66 @@
+import pandas as pd
+
+from deduplication import CLUSTER_COLUMN, deduplicate, linked_authorizations, settled_authorizations
+
+
+def transactions(rows):
+    """Audit rows from (cluster, type, cents) triples, one merchant and day."""
+    return pd.DataFrame([{
+        'Date': pd.Timestamp('2025-07-01'),
+        'Name': 'Liberty Vending',
+        'Amount_Cents': cents,
+        'Type': type_,
+        CLUSTER_COLUMN: cluster,
+    } for cluster, type_, cents in rows])
+
+
+def test_linked_authorization_needs_a_settlement_of_its_amount():
+    df = transactions([
+        (0, 'General Authorization', -600),
+        (0, 'General Authorization', -600),
+        (0, 'General PayPal Debit Card Transaction', -600),
+        (0, 'General Authorization', -1250),
+        (0, 'General PayPal Debit Card Transaction', -899),
+    ])
+    # One settlement of $6.00 settles one of the two $6.00 auths; the $12.50 auth has none
+    assert linked_authorizations(df).tolist() == [True, False, False, False, False]
+
+
+def test_pending_and_completed_rows_of_a_settled_authorization_both_go():
+    df = transactions([
+        (0, 'General Authorization', -979),
+        (0, 'General Authorization', -979),
+        (0, 'PreApproved Payment Bill User Payment', -979),
+    ]).assign(Transaction_ID=['7M64', '7M64', '4TS5'])
+    assert linked_authorizations(df).tolist() == [True, True, False]
+
+
+def test_hold_legs_and_voids_are_not_authorizations():
+    df = transactions([
+        (0, 'Account Hold for Open Authorization', -600),
+        (0, 'Void of Authorization', -600),
+        (0, 'General PayPal Debit Card Transaction', -600),
+    ])
+    assert not linked_authorizations(df).any()
+    assert not settled_authorizations(df.drop(columns=CLUSTER_COLUMN)).any()
+
+
+def test_settled_authorizations_pair_one_to_one():
+    df = transactions([
+        (0, 'General Authorization', -600),
+        (1, 'General Authorization', -600),
+        (2, 'PreApproved Payment Bill User Payment', -600),
+    ]).drop(columns=CLUSTER_COLUMN)
+    assert settled_authorizations(df).sum() == 1
+
+
+def test_deduplicate_reports_rows_removed_per_rule():
+    df = transactions([
+        (0, 'General Authorization', -600),
+        (0, 'General PayPal Debit Card Transaction', -600),
+        (1, 'General PayPal Debit Card Transaction', -600),
+    ])
+    deduplicated, removed = deduplicate(df)
+    assert removed == {'Exact duplicates': 1, 'Authorizations linked to a settlement': 1,
+                       'Authorizations with a settlement': 0}
+    assert deduplicated['Type'].tolist() == ['General PayPal Debit Card Transaction']
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from create_complete_audit import deduplicate_transactions, exclude_paired_holds
+from deduplication import CLUSTER_COLUMN
+from hold_pairing import HOLD_WINDOW, PAIRED_REASON, pair_holds, paired_hold_legs
+
+HOLD = 'Account Hold for Open Authorization'
+REVERSAL = 'Reversal of General Account Hold'
+CHARGE = 'General PayPal Debit Card Transaction'
+
+
+def transactions(rows):
+    """Personal-export audit rows from (time, name, type, cents) tuples on one day."""
+    return pd.DataFrame([{
+        'Date': pd.Timestamp('2025-07-17'),
+        'Timestamp': pd.Timestamp(f'2025-07-17 {time}'),
+        'Name': name,
+        'Amount_Cents': cents,
+        'Type': type_,
+        'Source': 'Personal',
+        'Analysis_Status': 'Included (True Spend)' if type_ == CHARGE else 'Excluded',
+        'Exclusion_Reason': '',
+        'Category': '',
+        CLUSTER_COLUMN: position,
+    } for position, (time, name, type_, cents) in enumerate(rows)])
+
+
+def two_guarded_charges():
+    # Two $6.00 charges on one day, each with its own hold and reversal leg. The
+    # legs are all named PayPal, so each pair repeats the other's date, amount, name and type
+    return transactions([
+        ('12:00:00', 'Liberty Vending', CHARGE, -600),
+        ('12:00:00', 'PayPal', HOLD, -600),
+        ('12:00:30', 'PayPal', REVERSAL, 600),
+        ('15:00:00', 'Snack Machine Co', CHARGE, -600),
+        ('15:00:00', 'PayPal', HOLD, -600),
+        ('15:00:40', 'PayPal', REVERSAL, 600),
+    ])
+
+
+def test_hold_and_reversal_legs_pair_with_their_charge():
+    pairs = pair_holds(two_guarded_charges())
+    assert pairs['Paired_With'].sort_index().tolist() == [0, 0, 3, 3]
+    assert (pairs['time_diff'] <= HOLD_WINDOW).all()
+
+
+def test_unpaired_legs_within_the_window_stay_unpaired():
+    df = pd.concat([two_guarded_charges(), transactions([
+        ('12:02:00', 'PayPal', HOLD, -600),   # second hold for an already guarded charge
+        ('12:01:00', 'PayPal', HOLD, -999),   # no charge of this amount
+        ('15:01:00', 'PayPal', REVERSAL, 999),
+    ])], ignore_index=True)
+    assert paired_hold_legs(df).tolist() == [False, True, True, False, True, True, False, False, False]
+
+
+def test_paired_legs_survive_deduplication_with_their_reason():
+    df = exclude_paired_holds(two_guarded_charges(), HOLD_WINDOW)
+    deduplicated = deduplicate_transactions(df)
+
+    assert len(deduplicated) == 6
+    legs = deduplicated[deduplicated['Type'].isin([HOLD, REVERSAL])]
+    assert (legs['Exclusion_Reason'] == PAIRED_REASON).all()
+    assert (legs['Analysis_Status'] == 'Excluded').all()
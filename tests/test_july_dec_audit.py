@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'create_july_dec_audit.py')
+
+COLUMNS = ['Date', 'Name', 'Amount', 'Net_Amount', 'Analysis_Status', 'Exclusion_Reason', 'Category', 'Source',
+           'Type', 'Status']
+
+
+def complete_audit(path, rows):
+    """Write a complete audit from (date, name, amount, net_amount, status, reason) rows."""
+    pd.DataFrame([{
+        'Date': date, 'Name': name, 'Amount': amount, 'Net_Amount': net, 'Analysis_Status': status,
+        'Exclusion_Reason': reason, 'Category': '', 'Source': 'Personal', 'Type': 'General Payment',
+        'Status': 'Completed',
+    } for date, name, amount, net, status, reason in rows], columns=COLUMNS).to_csv(path, index=False)
+
+
+def run_audit(directory, *args):
+    subprocess.run([sys.executable, SCRIPT, '--input', 'complete.csv', '--output', 'audit.csv', *args],
+                   cwd=directory, check=True, capture_output=True)
+    audit = pd.read_csv(os.path.join(directory, 'audit.csv'))
+    return audit.sort_values(list(audit.columns)).reset_index(drop=True)
+
+
+def test_incremental_run_matches_full_run_after_upstream_changes(tmp_path):
+    included, excluded = 'Included (True Spend)', 'Excluded'
+    rows = [
+        ('07/01/2025', 'Grocer', -40.0, -40.0, included, ''),
+        ('07/02/2025', 'Shop', -30.0, -30.0, included, ''),
+        ('07/03/2025', 'Shop', 10.0, 10.0, excluded, 'Money In / Refund'),
+        ('08/01/2025', 'Cafe', -5.0, -5.0, included, ''),
+    ]
+    complete_audit(tmp_path / 'complete.csv', rows)
+    run_audit(tmp_path, '--incremental')
+
+    # Upstream re-netting and re-exclusion change derived columns only, plus one new row
+    rows[1] = ('07/02/2025', 'Shop', -30.0, -20.0, included, '')
+    rows[3] = ('08/01/2025', 'Cafe', -5.0, -5.0, excluded, 'Duplicate')
+    rows.append(('08/02/2025', 'Cafe', -6.0, -6.0, included, ''))
+    complete_audit(tmp_path / 'complete.csv', rows)
+    incremental = run_audit(tmp_path, '--incremental')
+    full = run_audit(tmp_path)
+
+    pd.testing.assert_frame_equal(incremental, full)
+    assert full.loc[full['Name'] == 'Shop', 'Net_Amount'].tolist() == [-20.0, 10.0]
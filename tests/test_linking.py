@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from linking import link_clusters, link_transactions, linked_funding_legs
+
+
+def test_reference_chains_collapse_into_one_cluster():
+    ids = ['A', 'B', 'C', 'D', None]
+    refs = [None, 'A', 'B', None, 'D']
+    assert link_clusters(ids, refs).tolist() == [0, 0, 0, 3, 3]
+
+
+def test_references_outside_the_data_are_ignored():
+    assert link_clusters(['A', 'B'], ['X', None]).tolist() == [0, 1]
+
+
+def test_rows_without_an_id_column_are_singletons():
+    df = pd.DataFrame({'Type': ['General Payment', 'General Payment']}, index=[10, 20])
+    clusters = link_transactions(df)
+    assert clusters.index.tolist() == [10, 20]
+    assert clusters.tolist() == [0, 1]
+
+
+def test_only_linked_funding_legs_are_flagged():
+    df = pd.DataFrame({
+        'Transaction_ID': ['P1', 'D1', 'D2'],
+        'Reference_ID': [np.nan, 'P1', np.nan],
+        'Type': ['Mobile Payment', 'General Card Deposit', 'General Card Deposit'],
+    })
+    assert linked_funding_legs(df, link_transactions(df)).tolist() == [False, True, False]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from reconciliation import reconcile_exact, reconcile_fuzzy
+
+
+def frame(rows):
+    """Transactions from (timestamp, cents) pairs."""
+    return pd.DataFrame({'Date': pd.to_datetime([date for date, _ in rows]),
+                         'Amount_Cents': [cents for _, cents in rows]})
+
+
+def test_exact_match_respects_multiplicity():
+    left = frame([('2025-07-01', 100), ('2025-07-01', 100)])
+    right = frame([('2025-07-01', 100)])
+    matched, unmatched_left, unmatched_right = reconcile_exact(left, right, ['Date', 'Amount_Cents'],
+                                                               ['Date', 'Amount_Cents'])
+    assert len(matched) == 1
+    assert len(unmatched_left) == 1
+    assert unmatched_right.empty
+
+
+def test_fuzzy_match_looks_past_nearer_date_outside_amount_tolerance():
+    left = frame([('2025-07-01 12:00', 100)])
+    right = frame([('2025-07-01 12:05', 109), ('2025-07-01 18:00', 105)])
+    matched, unmatched_left, _ = reconcile_fuzzy(left, right, ['Date', 'Amount_Cents'], ['Date', 'Amount_Cents'],
+                                                 date_tolerance=pd.Timedelta(days=1), amount_tolerance=5)
+    assert matched['right_index'].tolist() == [1]
+    assert matched['amount_diff'].tolist() == [5]
+    assert unmatched_left.empty
+
+
+def test_fuzzy_match_prefers_higher_confidence_pair():
+    left = frame([('2025-07-01', 100), ('2025-07-02', 101)])
+    right = frame([('2025-07-02', 101)])
+    matched, unmatched_left, unmatched_right = reconcile_fuzzy(left, right, ['Date', 'Amount_Cents'],
+                                                               ['Date', 'Amount_Cents'], amount_tolerance=5)
+    assert matched[['left_index', 'right_index']].values.tolist() == [[1, 0]]
+    assert matched['confidence'].tolist() == [1.0]
+    assert unmatched_left.index.tolist() == [0]
+    assert unmatched_right.empty
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from refunds import net_refunds
+
+
+def transactions(rows):
+    """Audit rows at one merchant from (date, cents) pairs; positive cents are refunds."""
+    return pd.DataFrame([{
+        'Name': 'Shop',
+        'Date': pd.Timestamp(date),
+        'Amount_Cents': cents,
+        'Type': 'Payment Refund' if cents > 0 else 'General Payment',
+        'Exclusion_Reason': 'Money In / Refund' if cents > 0 else '',
+        'Analysis_Status': 'Excluded' if cents > 0 else 'Included (True Spend)',
+    } for date, cents in rows])
+
+
+def test_partial_refund_falls_back_to_older_purchase():
+    df = transactions([('2025-01-01', -5000), ('2025-01-02', -500), ('2025-01-03', 2000)])
+    refunded, matches = net_refunds(df)
+    assert refunded.tolist() == [2000, 0, 0]
+    assert matches[['refund_index', 'purchase_index', 'cents']].values.tolist() == [[2, 0, 2000]]
+    assert matches['partial'].all()
+
+
+def test_refund_that_does_not_fit_does_not_block_later_refunds():
+    df = transactions([('2025-01-01', -3000), ('2025-01-02', 2000), ('2025-01-03', 1500), ('2025-01-04', 1000)])
+    refunded, matches = net_refunds(df)
+    assert refunded.tolist() == [3000, 0, 0, 0]
+    assert sorted(matches['refund_index']) == [1, 3]
+
+
+def test_full_refund_matches_exact_amount_first():
+    df = transactions([('2025-01-01', -2000), ('2025-01-02', -1000), ('2025-01-03', 2000)])
+    refunded, matches = net_refunds(df)
+    assert refunded.tolist() == [2000, 0, 0]
+    assert not matches['partial'].any()
+
+
+def test_refund_outside_lookback_is_not_netted():
+    df = transactions([('2025-01-01', -5000), ('2025-06-01', 2000)])
+    refunded, matches = net_refunds(df, lookback=pd.Timedelta(days=90))
+    assert refunded.tolist() == [0, 0]
+    assert matches.empty